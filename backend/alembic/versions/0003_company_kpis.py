@@ -0,0 +1,80 @@
+"""company kpis
+
+Revision ID: 0003_company_kpis
+Revises: 0002_org_settings
+Create Date: 2024-01-03 00:00:00.000000
+"""
+from dataclasses import fields
+from datetime import datetime
+
+from alembic import op
+import pandas as pd
+import sqlalchemy as sa
+
+from app.services.finance import KPIResult, compute_portfolio_kpi_frame
+
+revision = "0003_company_kpis"
+down_revision = "0002_org_settings"
+branch_labels = None
+depends_on = None
+
+actuals = sa.table(
+    "actuals",
+    sa.column("company_id", sa.Integer),
+    sa.column("period", sa.Date),
+    sa.column("category", sa.String),
+    sa.column("amount", sa.Float),
+)
+companies = sa.table("companies", sa.column("id", sa.Integer))
+BATCH_COMPANIES = 500
+
+
+def upgrade() -> None:
+    op.create_table(
+        "company_kpis",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("company_id", sa.Integer, sa.ForeignKey("companies.id"), nullable=False),
+        sa.Column("period", sa.Date, nullable=False),
+        sa.Column("revenue", sa.Float, nullable=False),
+        sa.Column("gross_profit", sa.Float, nullable=False),
+        sa.Column("gross_margin", sa.Float, nullable=False),
+        sa.Column("opex", sa.Float, nullable=False),
+        sa.Column("ebitda", sa.Float, nullable=False),
+        sa.Column("burn", sa.Float, nullable=False),
+        sa.Column("cash_balance", sa.Float, nullable=False),
+        sa.Column("runway_months", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime, nullable=True),
+        sa.UniqueConstraint("company_id", "period", name="uq_company_kpis_company_period"),
+    )
+
+    # Dashboard and packs read only from company_kpis, so fill it for existing companies here
+    # rather than leaving them blank until someone runs the backfill by hand. Companies go
+    # through the batch KPI pass BATCH_COMPANIES at a time: one actuals query per batch.
+    bind = op.get_bind()
+    kpi_table = sa.table(
+        "company_kpis",
+        sa.column("company_id"),
+        sa.column("updated_at"),
+        *(sa.column(field.name) for field in fields(KPIResult)),
+    )
+    now = datetime.utcnow()
+    company_ids = bind.execute(sa.select(companies.c.id).order_by(companies.c.id)).scalars().all()
+    for start in range(0, len(company_ids), BATCH_COMPANIES):
+        rows = bind.execute(
+            sa.select(
+                actuals.c.company_id, actuals.c.period, actuals.c.category, actuals.c.amount
+            ).where(actuals.c.company_id.in_(company_ids[start : start + BATCH_COMPANIES]))
+        ).all()
+        frame = compute_portfolio_kpi_frame(
+            pd.DataFrame(rows, columns=["company_id", "period", "category", "amount"])
+        )
+        kpis = [
+            {"company_id": company_id, "updated_at": now, **k.__dict__}
+            for company_id, k in zip(frame.company_id.tolist(), frame.to_results(), strict=True)
+        ]
+        if kpis:
+            bind.execute(kpi_table.insert(), kpis)
+
+
+def downgrade() -> None:
+    op.drop_table("company_kpis")
@@ -0,0 +1,37 @@
+"""hot path indexes
+
+Revision ID: 0004_hot_path_indexes
+Revises: 0003_company_kpis
+Create Date: 2024-01-04 00:00:00.000000
+"""
+from alembic import op
+
+revision = "0004_hot_path_indexes"
+down_revision = "0003_company_kpis"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_actuals_company_period", "actuals", ["company_id", "period"])
+    op.create_index("ix_companies_org_id", "companies", ["org_id"])
+    op.create_index("ix_audit_logs_org_created", "audit_logs", ["org_id", "created_at"])
+    op.create_index(
+        "ix_audit_logs_org_action_created", "audit_logs", ["org_id", "action", "created_at"]
+    )
+    # Keep the row the old first()-based upsert was updating before enforcing uniqueness.
+    op.execute(
+        "DELETE FROM mappings WHERE id NOT IN "
+        "(SELECT MIN(id) FROM mappings GROUP BY company_id, source_account)"
+    )
+    op.create_unique_constraint(
+        "uq_mappings_company_source", "mappings", ["company_id", "source_account"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_mappings_company_source", "mappings", type_="unique")
+    op.drop_index("ix_audit_logs_org_action_created", table_name="audit_logs")
+    op.drop_index("ix_audit_logs_org_created", table_name="audit_logs")
+    op.drop_index("ix_companies_org_id", table_name="companies")
+    op.drop_index("ix_actuals_company_period", table_name="actuals")
@@ -0,0 +1,23 @@
+"""user token version
+
+Revision ID: 0005_user_token_version
+Revises: 0004_hot_path_indexes
+Create Date: 2024-01-05 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_user_token_version"
+down_revision = "0004_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users", sa.Column("token_version", sa.Integer, nullable=False, server_default="0")
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,23 @@
+"""upload raw text nullable
+
+Revision ID: 0006_upload_raw_text_nullable
+Revises: 0005_user_token_version
+Create Date: 2024-01-06 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_upload_raw_text_nullable"
+down_revision = "0005_user_token_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Binary (Parquet) uploads have no text form.
+    op.alter_column("uploads", "raw_text", existing_type=sa.Text, nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE uploads SET raw_text = '' WHERE raw_text IS NULL")
+    op.alter_column("uploads", "raw_text", existing_type=sa.Text, nullable=False)
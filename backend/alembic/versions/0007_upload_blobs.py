@@ -0,0 +1,83 @@
+"""upload blobs
+
+Revision ID: 0007_upload_blobs
+Revises: 0006_upload_raw_text_nullable
+Create Date: 2024-01-07 00:00:00.000000
+"""
+import hashlib
+from io import BytesIO
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.blobs import get_blob_store
+
+revision = "0007_upload_blobs"
+down_revision = "0006_upload_raw_text_nullable"
+branch_labels = None
+depends_on = None
+
+uploads = sa.table(
+    "uploads",
+    sa.column("id", sa.Integer),
+    sa.column("raw_text", sa.Text),
+    sa.column("sha256", sa.String),
+    sa.column("size_bytes", sa.BigInteger),
+    sa.column("row_count", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column("uploads", sa.Column("sha256", sa.String(64), nullable=True))
+    op.add_column("uploads", sa.Column("size_bytes", sa.BigInteger, nullable=True))
+    op.add_column("uploads", sa.Column("row_count", sa.Integer, nullable=True))
+
+    # Move existing bodies into the blob store; identical bodies collapse to one blob. Only the
+    # ids are listed up front and each body is fetched on its own, so one body is in memory at a
+    # time however large the table is.
+    # Parquet uploads made since 0006 kept no body (raw_text is NULL), so there is nothing to
+    # store or hash. Their sha256, size_bytes and row_count stay NULL rather than all sharing
+    # the empty blob's digest, and the columns stay nullable for them.
+    bind = op.get_bind()
+    store = get_blob_store()
+    upload_ids = (
+        bind.execute(
+            sa.select(uploads.c.id).where(uploads.c.raw_text.is_not(None)).order_by(uploads.c.id)
+        )
+        .scalars()
+        .all()
+    )
+    for upload_id in upload_ids:
+        raw_text = bind.execute(
+            sa.select(uploads.c.raw_text).where(uploads.c.id == upload_id)
+        ).scalar_one()
+        body = raw_text.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        store.put(digest, BytesIO(body))
+        bind.execute(
+            uploads.update()
+            .where(uploads.c.id == upload_id)
+            .values(
+                sha256=digest,
+                size_bytes=len(body),
+                row_count=max(0, len(body.splitlines()) - 1),
+            )
+        )
+
+    op.create_index("ix_uploads_company_sha256", "uploads", ["company_id", "sha256"])
+    op.drop_column("uploads", "raw_text")
+
+
+def downgrade() -> None:
+    op.add_column("uploads", sa.Column("raw_text", sa.Text, nullable=True))
+    bind = op.get_bind()
+    store = get_blob_store()
+    stored = sa.select(uploads.c.id, uploads.c.sha256).where(uploads.c.sha256.is_not(None))
+    for upload_id, digest in bind.execute(stored).all():
+        with store.open(digest) as blob:
+            raw_text = blob.read().decode("utf-8", errors="replace")
+        bind.execute(uploads.update().where(uploads.c.id == upload_id).values(raw_text=raw_text))
+    op.drop_index("ix_uploads_company_sha256", table_name="uploads")
+    op.drop_column("uploads", "row_count")
+    op.drop_column("uploads", "size_bytes")
+    op.drop_column("uploads", "sha256")
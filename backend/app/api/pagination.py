@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence, TypeVar
+
+from fastapi import HTTPException, Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+T = TypeVar("T")
+
+PageLimit = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for the sort key of the last row on a page."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _typed(value: Any, kind: type) -> Any:
+    if kind is datetime:
+        if not isinstance(value, str):
+            return None
+        parsed = datetime.fromisoformat(value)
+        # Cursors are written from naive UTC columns; an offset would not compare against them.
+        return parsed if parsed.tzinfo is None else None
+    if isinstance(value, bool) or not isinstance(value, kind):
+        return None
+    return value
+
+
+def decode_cursor(cursor: str, *kinds: type) -> list:
+    """Sort key values from ``cursor``, checked against ``kinds`` (int, str or datetime).
+
+    Anything that does not decode to exactly those types is a 400, never a query error.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(kinds):
+            raise ValueError
+        typed = [_typed(value, kind) for value, kind in zip(values, kinds, strict=True)]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if any(value is None for value in typed):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return typed
+
+
+def page(rows: Sequence[T], limit: int, key: Callable[[T], tuple]) -> dict:
+    """Envelope for ``rows`` fetched with ``limit + 1``; the extra row only signals more."""
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
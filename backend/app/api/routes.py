@@ -1,27 +1,39 @@
-from datetime import date
-import csv
-from io import BytesIO, StringIO
+from datetime import datetime
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Iterator
 
-import pandas as pd
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from jose import jwt
-
+from opentelemetry import trace
+import pyarrow as pa
+
+from app.api.pagination import PageLimit, decode_cursor, page
+from app.auth.principals import (
+    Principal,
+    invalidate_principal,
+    load_principal,
+    load_principal_async,
+)
 from app.auth.security import create_token, hash_password, verify_password
 from app.core.config import settings
-from app.db.session import get_db
-from app.excel.exporter import build_workbook
+from app.core.timing import timed
+from app.db.session import get_async_db, get_db
+from app.jobs.tasks import build_pack
 from app.models.entities import (
     Actual,
     AuditLog,
     Company,
     Mapping,
     Organization,
-    OrganizationSetting,
     Scenario,
     Upload,
     User,
@@ -30,26 +42,57 @@ from app.schemas.common import (
     AuditLogOut,
     CompanyCreate,
     CompanyOut,
+    MappingStatusPage,
     OrgSettingsOut,
     OrgSettingsUpdate,
+    Page,
     ScenarioCreate,
     ScenarioOut,
+    SimulationCreate,
     UserCreate,
     UserOut,
 )
-from app.services.finance import CANONICAL_CATEGORIES, ActualRecord, compute_kpis, forecast, sensitivity_grid
+from app.services.audit import audit_writer, record_audit
+from app.services.blobs import get_blob_store, sha256_stream
+from app.services.columnar import ACTUAL_SCHEMA, FORECAST_SCHEMA, KPI_SCHEMA, forecast_table
+from app.services.exports import (
+    MAPPING_SCHEMA,
+    MEDIA_TYPES,
+    ExportFormat,
+    actual_rows,
+    encode_rows,
+    kpi_rows,
+    stream_rows,
+)
+from app.services.finance import CANONICAL_CATEGORIES, Distribution, simulate_forecast
+from app.services.ingest import IngestError, ingest_actuals_csv, ingest_actuals_parquet
+from app.services.kpi_store import load_company_kpis, load_latest_kpis, refresh_company_kpis
+from app.services.mappings import (
+    MappingImportError,
+    import_mappings_csv,
+    upsert_mappings,
+    validate_mapping,
+)
+from app.services.org_settings import load_org_settings, save_org_settings
+from app.services.packs import (
+    cache_pack,
+    get_cached_pack,
+    load_pack_inputs,
+    pack_fingerprint,
+    pack_is_cached,
+    render_pack_file,
+    stream_portfolio_zip,
+    unmapped_accounts,
+)
+from app.services.response_cache import bump_data_version, lookup_response, store_response
 
 router = APIRouter()
+tracer = trace.get_tracer(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def _log(db: Session, org_id: int, user_id: int | None, action: str, detail: str | None = None) -> None:
-    db.add(AuditLog(org_id=org_id, user_id=user_id, action=action, detail=detail))
-    db.commit()
-
-
-def _current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _token_claims(token: str) -> tuple[int, int]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
     except Exception as exc:
@@ -57,14 +100,35 @@ def _current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token subject")
-    user = db.query(User).get(int(user_id))
+    return int(user_id), payload.get("ver", 0)
+
+
+def _check_principal(user: Principal | None, token_version: int) -> Principal:
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    if user.token_version != token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
     return user
 
 
-def _require_roles(allowed_roles: list[str]):
-    def _role_dependency(user: User = Depends(_current_user)) -> User:
+def _current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    user_id, token_version = _token_claims(token)
+    return _check_principal(load_principal(db, user_id, token_version), token_version)
+
+
+async def _current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    user_id, token_version = _token_claims(token)
+    return _check_principal(
+        await load_principal_async(db, user_id, token_version), token_version
+    )
+
+
+def _require_roles(allowed_roles: list[str], current_user=_current_user):
+    async def _role_dependency(user: Principal = Depends(current_user)) -> Principal:
         if user.role not in allowed_roles:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return user
@@ -72,22 +136,6 @@ def _require_roles(allowed_roles: list[str]):
     return _role_dependency
 
 
-def _org_setting(db: Session, org_id: int) -> OrganizationSetting:
-    settings_row = db.query(OrganizationSetting).filter(OrganizationSetting.org_id == org_id).first()
-    if settings_row:
-        return settings_row
-    settings_row = OrganizationSetting(
-        org_id=org_id,
-        runway_risk_threshold=settings.runway_risk_threshold,
-        revenue_drop_threshold=settings.revenue_drop_threshold,
-        margin_drop_threshold=settings.margin_drop_threshold,
-    )
-    db.add(settings_row)
-    db.commit()
-    db.refresh(settings_row)
-    return settings_row
-
-
 @router.post("/auth/register")
 def register(org_name: str, email: str, password: str, db: Session = Depends(get_db)):
     org = Organization(name=org_name)
@@ -96,8 +144,9 @@ def register(org_name: str, email: str, password: str, db: Session = Depends(get
     db.refresh(org)
     user = User(org_id=org.id, email=email, hashed_password=hash_password(password), role="org_admin")
     db.add(user)
+    db.flush()
+    record_audit(db, org.id, user.id, "user_registered", email)
     db.commit()
-    _log(db, org.id, user.id, "user_registered", email)
     return {"org_id": org.id, "user_id": user.id}
 
 
@@ -106,20 +155,30 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if not user or not verify_password(password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access = create_token(str(user.id), settings.access_token_expire_minutes)
-    refresh = create_token(str(user.id), settings.refresh_token_expire_minutes)
+    access = create_token(str(user.id), settings.access_token_expire_minutes, user.token_version)
+    refresh = create_token(str(user.id), settings.refresh_token_expire_minutes, user.token_version)
     return {"access_token": access, "refresh_token": refresh, "token_type": "bearer"}
 
 
-@router.get("/users", response_model=list[UserOut])
-def list_users(user: User = Depends(_require_roles(["org_admin"])), db: Session = Depends(get_db)):
-    return db.query(User).filter(User.org_id == user.org_id).all()
+@router.get("/users", response_model=Page[UserOut])
+def list_users(
+    cursor: str | None = None,
+    limit: int = PageLimit,
+    user: Principal = Depends(_require_roles(["org_admin"])),
+    db: Session = Depends(get_db),
+):
+    query = db.query(User).filter(User.org_id == user.org_id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, int)
+        query = query.filter(User.id > after_id)
+    rows = query.order_by(User.id).limit(limit + 1).all()
+    return page(rows, limit, lambda row: (row.id,))
 
 
 @router.post("/users", response_model=UserOut)
 def create_user(
     payload: UserCreate,
-    user: User = Depends(_require_roles(["org_admin"])),
+    user: Principal = Depends(_require_roles(["org_admin"])),
     db: Session = Depends(get_db),
 ):
     new_user = User(
@@ -129,9 +188,9 @@ def create_user(
         role=payload.role,
     )
     db.add(new_user)
+    record_audit(db, user.org_id, user.id, "user_created", payload.email)
     db.commit()
     db.refresh(new_user)
-    _log(db, user.org_id, user.id, "user_created", payload.email)
     return new_user
 
 
@@ -139,79 +198,104 @@ def create_user(
 def update_user_role(
     user_id: int,
     role: str,
-    user: User = Depends(_require_roles(["org_admin"])),
+    user: Principal = Depends(_require_roles(["org_admin"])),
     db: Session = Depends(get_db),
 ):
     target = db.query(User).filter(User.id == user_id, User.org_id == user.org_id).first()
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
     target.role = role
+    record_audit(db, user.org_id, user.id, "user_role_updated", f"{target.email}:{role}")
     db.commit()
-    _log(db, user.org_id, user.id, "user_role_updated", f"{target.email}:{role}")
+    # The user's existing tokens stay valid; every worker picks up the new role on its next
+    # request for them.
+    invalidate_principal(target.id)
     return target
 
 
 @router.post("/companies", response_model=CompanyOut)
 def create_company(
     payload: CompanyCreate,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
     company = Company(org_id=user.org_id, name=payload.name, sector=payload.sector)
     db.add(company)
+    record_audit(db, user.org_id, user.id, "company_created", company.name)
     db.commit()
     db.refresh(company)
-    _log(db, user.org_id, user.id, "company_created", company.name)
     return company
 
 
-@router.get("/companies", response_model=list[CompanyOut])
-def list_companies(user: User = Depends(_current_user), db: Session = Depends(get_db)):
-    return db.query(Company).filter(Company.org_id == user.org_id).all()
+@router.get("/companies", response_model=Page[CompanyOut])
+async def list_companies(
+    cursor: str | None = None,
+    limit: int = PageLimit,
+    user: Principal = Depends(_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    query = select(Company).where(Company.org_id == user.org_id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, int)
+        query = query.where(Company.id > after_id)
+    rows = (await db.scalars(query.order_by(Company.id).limit(limit + 1))).all()
+    return page(rows, limit, lambda row: (row.id,))
 
 
 @router.post("/companies/{company_id}/actuals")
 def upload_actuals(
     company_id: int,
     file: UploadFile = File(...),
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
-    content = file.file.read().decode("utf-8")
-    df = pd.read_csv(StringIO(content))
-    if not {"period", "category", "amount"}.issubset(df.columns):
-        raise HTTPException(status_code=400, detail="CSV must include period, category, amount")
-    db.add(Upload(company_id=company_id, filename=file.filename, raw_text=content))
+    digest, size = sha256_stream(file.file)
+    duplicate = (
+        db.query(Upload.id)
+        .filter(Upload.company_id == company_id, Upload.sha256 == digest)
+        .first()
+    )
+    if duplicate:
+        record_audit(
+            db,
+            user.org_id,
+            user.id,
+            "actuals_uploaded",
+            f"{file.filename} (duplicate of upload {duplicate.id})",
+        )
+        db.commit()
+        return {"status": "duplicate", "upload_id": duplicate.id}
+    is_parquet = (file.filename or "").lower().endswith(".parquet")
     mappings = {
         m.source_account: m.canonical_category
         for m in db.query(Mapping).filter(Mapping.company_id == company_id).all()
     }
-    for _, row in df.iterrows():
-        source_category = str(row["category"])
-        category = source_category
-        if category not in CANONICAL_CATEGORIES:
-            category = mappings.get(source_category)
-            if category is None:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Category '{source_category}' missing mapping to canonical schema.",
-                )
-        actual = Actual(
-            company_id=company_id,
-            period=date.fromisoformat(str(row["period"])),
-            category=category,
-            amount=float(row["amount"]),
-        )
-        db.add(actual)
+    ingest = ingest_actuals_parquet if is_parquet else ingest_actuals_csv
+    try:
+        result = ingest(db, company_id, file.file, mappings)
+    except IngestError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    get_blob_store().put(digest, file.file)
+    upload = Upload(
+        company_id=company_id,
+        filename=file.filename,
+        sha256=digest,
+        size_bytes=size,
+        row_count=result.rows,
+    )
+    db.add(upload)
+    refresh_company_kpis(db, company_id, result.periods)
+    record_audit(db, user.org_id, user.id, "actuals_uploaded", file.filename)
     db.commit()
-    _log(db, user.org_id, user.id, "actuals_uploaded", file.filename)
-    return {"status": "ok"}
+    bump_data_version(user.org_id, company_id)
+    return {"status": "ok", "upload_id": upload.id}
 
 
 @router.get("/companies/{company_id}/mappings/suggest")
 def suggest_mappings(
     company_id: int,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
     actuals = db.query(Actual).filter(Actual.company_id == company_id).all()
@@ -227,20 +311,28 @@ def suggest_mappings(
     return {"suggestions": suggestions}
 
 
-@router.get("/companies/{company_id}/mappings/status")
-def mapping_status(
+@router.get("/companies/{company_id}/mappings/status", response_model=MappingStatusPage)
+async def mapping_status(
     company_id: int,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = PageLimit,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"], _current_user_async)),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    actuals = db.query(Actual).filter(Actual.company_id == company_id).all()
-    sources = {a.category for a in actuals}
-    mappings = {
-        m.source_account: m.canonical_category
-        for m in db.query(Mapping).filter(Mapping.company_id == company_id).all()
-    }
-    unmapped = [source for source in sources if source not in CANONICAL_CATEGORIES and source not in mappings]
-    return {"unmapped_accounts": unmapped, "mapped_count": len(mappings)}
+    mapped = select(Mapping.source_account).where(Mapping.company_id == company_id)
+    query = select(Actual.category).where(
+        Actual.company_id == company_id,
+        Actual.category.not_in(CANONICAL_CATEGORIES),
+        Actual.category.not_in(mapped),
+    )
+    if cursor:
+        (after,) = decode_cursor(cursor, str)
+        query = query.where(Actual.category > after)
+    rows = (
+        await db.scalars(query.distinct().order_by(Actual.category).limit(limit + 1))
+    ).all()
+    mapped_count = await db.scalar(select(func.count()).select_from(mapped.subquery()))
+    return {**page(rows, limit, lambda row: (row,)), "mapped_count": mapped_count}
 
 
 @router.post("/companies/{company_id}/mappings")
@@ -248,209 +340,348 @@ def upsert_mapping(
     company_id: int,
     source_account: str,
     canonical_category: str,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
-    mapping = (
-        db.query(Mapping)
-        .filter(Mapping.company_id == company_id, Mapping.source_account == source_account)
-        .first()
-    )
-    if mapping:
-        mapping.canonical_category = canonical_category
-    else:
-        mapping = Mapping(
-            company_id=company_id,
-            source_account=source_account,
-            canonical_category=canonical_category,
-        )
-        db.add(mapping)
+    error = validate_mapping(source_account, canonical_category)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    upsert_mappings(db, company_id, {source_account: canonical_category})
+    record_audit(db, user.org_id, user.id, "mapping_updated", source_account)
     db.commit()
-    _log(db, user.org_id, user.id, "mapping_updated", source_account)
+    bump_data_version(user.org_id, company_id)
     return {"status": "ok"}
 
 
 @router.get("/companies/{company_id}/mappings/export")
 def export_mappings(
     company_id: int,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
-    mappings = db.query(Mapping).filter(Mapping.company_id == company_id).all()
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["source_account", "canonical_category"])
-    for mapping in mappings:
-        writer.writerow([mapping.source_account, mapping.canonical_category])
-    response = StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+    rows = stream_rows(
+        db.get_bind(),
+        select(Mapping.source_account, Mapping.canonical_category)
+        .where(Mapping.company_id == company_id)
+        .order_by(Mapping.id),
     )
-    response.headers["Content-Disposition"] = "attachment; filename=mappings.csv"
-    return response
+    return _export_response("csv", MAPPING_SCHEMA, rows, "mappings")
 
 
 @router.post("/companies/{company_id}/mappings/import")
 def import_mappings(
     company_id: int,
     file: UploadFile = File(...),
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
-    content = file.file.read().decode("utf-8")
-    reader = csv.DictReader(StringIO(content))
-    if "source_account" not in reader.fieldnames or "canonical_category" not in reader.fieldnames:
-        raise HTTPException(status_code=400, detail="CSV must include source_account and canonical_category")
-    for row in reader:
-        source_account = row["source_account"]
-        canonical_category = row["canonical_category"]
-        mapping = (
-            db.query(Mapping)
-            .filter(Mapping.company_id == company_id, Mapping.source_account == source_account)
-            .first()
-        )
-        if mapping:
-            mapping.canonical_category = canonical_category
-        else:
-            db.add(
-                Mapping(
-                    company_id=company_id,
-                    source_account=source_account,
-                    canonical_category=canonical_category,
-                )
-            )
+    try:
+        result = import_mappings_csv(db, company_id, TextIOWrapper(file.file, encoding="utf-8"))
+    except MappingImportError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if result.errors:
+        raise HTTPException(status_code=400, detail={"errors": result.errors})
+    record_audit(db, user.org_id, user.id, "mapping_imported", file.filename)
     db.commit()
-    _log(db, user.org_id, user.id, "mapping_imported", file.filename)
-    return {"status": "ok"}
+    bump_data_version(user.org_id, company_id)
+    return {
+        "status": "ok",
+        "inserted": result.inserted,
+        "updated": result.updated,
+        "unchanged": result.unchanged,
+    }
 
 
 @router.post("/companies/{company_id}/scenarios", response_model=ScenarioOut)
 def create_scenario(
     company_id: int,
     payload: ScenarioCreate,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
     db: Session = Depends(get_db),
 ):
     scenario = Scenario(company_id=company_id, **payload.model_dump())
     db.add(scenario)
+    record_audit(db, user.org_id, user.id, "scenario_created", scenario.name)
     db.commit()
+    bump_data_version(user.org_id, company_id)
     db.refresh(scenario)
-    _log(db, user.org_id, user.id, "scenario_created", scenario.name)
     return scenario
 
 
+@router.get("/companies/{company_id}/kpis")
+async def company_kpis(
+    company_id: int,
+    if_none_match: str | None = Header(default=None),
+    user: Principal = Depends(
+        _require_roles(["org_admin", "analyst", "viewer"], _current_user_async)
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def _compute():
+        company = await db.get(Company, company_id)
+        if company is None or company.org_id != user.org_id:
+            raise HTTPException(status_code=404, detail="Company not found")
+        return {"kpis": await db.run_sync(load_company_kpis, company_id)}
+
+    return await _cached_json("kpis", user.org_id, company_id, if_none_match, _compute)
+
+
+def _export_response(
+    export_format: ExportFormat, schema: pa.Schema, rows, name: str
+) -> StreamingResponse:
+    response = StreamingResponse(
+        encode_rows(export_format, schema, rows), media_type=MEDIA_TYPES[export_format]
+    )
+    response.headers["Content-Disposition"] = f"attachment; filename={name}.{export_format}"
+    return response
+
+
+def _require_company(db: Session, org_id: int, company_id: int) -> None:
+    if not db.query(Company.id).filter(Company.id == company_id, Company.org_id == org_id).first():
+        raise HTTPException(status_code=404, detail="Company not found")
+
+
+@router.get("/companies/{company_id}/actuals/export")
+def export_company_actuals(
+    company_id: int,
+    format: ExportFormat = "csv",
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    rows = actual_rows(db, user.org_id, company_id)
+    return _export_response(format, ACTUAL_SCHEMA, rows, f"company_{company_id}_actuals")
+
+
+@router.get("/companies/{company_id}/kpis/export")
+def export_company_kpis(
+    company_id: int,
+    format: ExportFormat = "csv",
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    rows = kpi_rows(db, user.org_id, company_id)
+    return _export_response(format, KPI_SCHEMA, rows, f"company_{company_id}_kpis")
+
+
+@router.get("/companies/{company_id}/forecast/export")
+def export_company_forecast(
+    company_id: int,
+    format: ExportFormat = "csv",
+    months: int = Query(12, ge=1, le=120),
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    inputs = load_pack_inputs(db, company_id)
+    if not inputs.kpis:
+        raise HTTPException(status_code=400, detail="No actuals uploaded for company.")
+    with timed("compute"):
+        table = forecast_table(inputs.kpis[-1], months, inputs.scenarios)
+    rows = zip(*(column.to_pylist() for column in table.columns), strict=True)
+    return _export_response(format, FORECAST_SCHEMA, rows, f"company_{company_id}_forecast")
+
+
+@router.post("/companies/{company_id}/simulations")
+def run_simulation(
+    company_id: int,
+    payload: SimulationCreate,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    kpis = load_company_kpis(db, company_id)
+    if not kpis:
+        raise HTTPException(status_code=400, detail="No actuals uploaded for company.")
+    try:
+        drivers = {
+            name: Distribution(spec.kind, tuple(spec.params))
+            for name, spec in (
+                ("revenue_growth", payload.revenue_growth),
+                ("gross_margin", payload.gross_margin),
+                ("opex_growth", payload.opex_growth),
+            )
+        }
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    with timed("compute"):
+        result = simulate_forecast(
+            kpis[-1], payload.months, **drivers, paths=payload.paths, seed=payload.seed
+        )
+    return {"paths": payload.paths, "seed": payload.seed, "months": result.to_rows()}
+
+
 @router.get("/companies/{company_id}/pack")
 def download_pack(
     company_id: int,
-    user: User = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+    simulate: bool = False,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
     db: Session = Depends(get_db),
 ):
-    actuals = db.query(Actual).filter(Actual.company_id == company_id).all()
-    mappings = {
-        m.source_account: m.canonical_category
-        for m in db.query(Mapping).filter(Mapping.company_id == company_id).all()
-    }
-    sources = {a.category for a in actuals}
-    unmapped = [source for source in sources if source not in CANONICAL_CATEGORIES and source not in mappings]
-    if unmapped:
+    _require_company(db, user.org_id, company_id)
+    if unmapped_accounts(db, company_id):
         raise HTTPException(status_code=400, detail="Unmapped accounts present; resolve mappings before pack.")
-    records = [ActualRecord(a.period, a.category, a.amount) for a in actuals]
-    kpis = compute_kpis(records)
-    scenario_defaults = {
-        "Base": {"revenue_growth": 0.05, "gross_margin": 0.6, "opex_growth": 0.03},
-        "Upside": {"revenue_growth": 0.1, "gross_margin": 0.65, "opex_growth": 0.04},
-        "Downside": {"revenue_growth": -0.02, "gross_margin": 0.5, "opex_growth": 0.02},
-    }
-    scenario_rows = db.query(Scenario).filter(Scenario.company_id == company_id).all()
-    scenario_map = {s.name: s for s in scenario_rows}
-    base = scenario_map.get("Base")
-    base_params = base or Scenario(company_id=company_id, name="Base", **scenario_defaults["Base"])
-    forecasted = forecast(
-        kpis, 12, base_params.revenue_growth, base_params.gross_margin, base_params.opex_growth
-    )
-    sensitivity = sensitivity_grid(
-        kpis,
-        revenue_growth_range=[-0.05, 0.0, 0.05],
-        gross_margin_range=[0.4, 0.5, 0.6],
-        opex_growth=base_params.opex_growth,
-    )
-    scenarios = []
-    scenario_results = []
-    scenario_deltas = []
-    for name, defaults in scenario_defaults.items():
-        scenario = scenario_map.get(name)
-        params = scenario or Scenario(company_id=company_id, name=name, **defaults)
-        scenario_forecast = forecast(
-            kpis, 12, params.revenue_growth, params.gross_margin, params.opex_growth
-        )
-        latest_forecast = scenario_forecast[-1] if scenario_forecast else None
-        scenarios.append(
-            {
-                "name": name,
-                "revenue_growth": params.revenue_growth,
-                "gross_margin": params.gross_margin,
-                "opex_growth": params.opex_growth,
-            }
-        )
-        scenario_results.append(
-            {
-                "name": name,
-                "ending_revenue": latest_forecast.revenue if latest_forecast else 0.0,
-                "ending_ebitda": latest_forecast.ebitda if latest_forecast else 0.0,
-                "ending_runway_months": latest_forecast.runway_months if latest_forecast else 0.0,
-            }
-        )
-    base_result = next((r for r in scenario_results if r["name"] == "Base"), None)
-    for result in scenario_results:
-        if base_result and result["name"] != "Base":
-            scenario_deltas.append(
-                {
-                    "name": result["name"],
-                    "delta_revenue": result["ending_revenue"] - base_result["ending_revenue"],
-                    "delta_ebitda": result["ending_ebitda"] - base_result["ending_ebitda"],
-                    "delta_runway_months": result["ending_runway_months"]
-                    - base_result["ending_runway_months"],
-                }
-            )
-    company = db.query(Company).get(company_id)
-    excel_bytes = build_workbook(
-        company.name if company else "Company",
-        kpis,
-        forecasted,
-        scenarios,
-        scenario_results,
-        scenario_deltas,
-        sensitivity,
-    )
-    _log(db, user.org_id, user.id, "pack_generated", str(company_id))
+    fingerprint = pack_fingerprint(db, company_id, simulate)
+    with tracer.start_as_current_span("pack.cache_lookup") as span:
+        excel_bytes = get_cached_pack(company_id, fingerprint)
+        span.set_attribute("cache.hit", excel_bytes is not None)
+        span.set_attribute("pack.bytes", len(excel_bytes or b""))
+    if excel_bytes is None:
+        inputs = load_pack_inputs(db, company_id, simulate)
+        with timed("compute"):
+            pack_file = render_pack_file(inputs)
+        size = pack_file.seek(0, 2)
+        pack_file.seek(0)
+        if size > settings.pack_cache_max_bytes:
+            audit_writer.submit(db, user.org_id, user.id, "pack_generated", str(company_id))
+            return _pack_response(company_id, _iter_file(pack_file))
+        with pack_file:
+            excel_bytes = pack_file.read()
+        cache_pack(company_id, fingerprint, excel_bytes)
+    audit_writer.submit(db, user.org_id, user.id, "pack_generated", str(company_id))
+    return _pack_response(company_id, BytesIO(excel_bytes))
+
+
+def _iter_file(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    with stream:
+        while chunk := stream.read(chunk_size):
+            yield chunk
+
+
+def _pack_response(company_id: int, content: BinaryIO | Iterator[bytes]) -> StreamingResponse:
     filename = f"company_{company_id}_pack.xlsx"
-    stream = BytesIO(excel_bytes)
     response = StreamingResponse(
-        stream, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        content, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
     response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     return response
 
 
-@router.get("/portfolio/dashboard")
-def portfolio_dashboard(
-    user: User = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+def _pack_job_status(company_id: int, job_id: str) -> dict[str, str]:
+    if pack_is_cached(company_id, job_id):
+        status = "SUCCESS"
+    else:
+        status = build_pack.AsyncResult(f"pack-{company_id}-{job_id}").state
+    return {"job_id": job_id, "status": status}
+
+
+async def _cached_json(
+    name: str,
+    org_id: int,
+    company_id: int | None,
+    if_none_match: str | None,
+    compute: Callable[[], Awaitable[dict]],
+) -> Response:
+    entry = await run_in_threadpool(lookup_response, name, org_id, company_id, if_none_match)
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if entry.not_modified:
+        return Response(status_code=304, headers=headers)
+    body = entry.body
+    if body is None:
+        body = JSONResponse(jsonable_encoder(await compute())).body
+        await run_in_threadpool(store_response, entry, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.post("/companies/{company_id}/pack/jobs")
+def submit_pack_job(
+    company_id: int,
+    simulate: bool = False,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
     db: Session = Depends(get_db),
 ):
-    companies = db.query(Company).filter(Company.org_id == user.org_id).all()
-    summary = []
+    _require_company(db, user.org_id, company_id)
+    if unmapped_accounts(db, company_id):
+        raise HTTPException(status_code=400, detail="Unmapped accounts present; resolve mappings before pack.")
+    job_id = pack_fingerprint(db, company_id, simulate)
+    if not pack_is_cached(company_id, job_id):
+        build_pack.apply_async(
+            args=[company_id, job_id, simulate], task_id=f"pack-{company_id}-{job_id}"
+        )
+    audit_writer.submit(db, user.org_id, user.id, "pack_job_submitted", str(company_id))
+    return _pack_job_status(company_id, job_id)
+
+
+@router.get("/companies/{company_id}/pack/jobs/{job_id}")
+def pack_job_status(
+    company_id: int,
+    job_id: str,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    return _pack_job_status(company_id, job_id)
+
+
+@router.get("/companies/{company_id}/pack/jobs/{job_id}/download")
+def download_pack_job(
+    company_id: int,
+    job_id: str,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+    db: Session = Depends(get_db),
+):
+    _require_company(db, user.org_id, company_id)
+    excel_bytes = get_cached_pack(company_id, job_id)
+    if excel_bytes is None:
+        raise HTTPException(status_code=404, detail="Pack not ready")
+    audit_writer.submit(db, user.org_id, user.id, "pack_generated", str(company_id))
+    return _pack_response(company_id, BytesIO(excel_bytes))
+
+
+@router.get("/portfolio/actuals/export")
+def export_portfolio_actuals(
+    format: ExportFormat = "csv",
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
+    db: Session = Depends(get_db),
+):
+    return _export_response(format, ACTUAL_SCHEMA, actual_rows(db, user.org_id), "actuals")
+
+
+@router.get("/portfolio/kpis/export")
+def export_portfolio_kpis(
+    format: ExportFormat = "csv",
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"])),
+    db: Session = Depends(get_db),
+):
+    return _export_response(format, KPI_SCHEMA, kpi_rows(db, user.org_id), "kpis")
+
+
+@router.get("/portfolio/packs")
+def download_portfolio_packs(
+    user: Principal = Depends(_require_roles(["org_admin", "analyst", "viewer"])),
+    db: Session = Depends(get_db),
+):
+    companies = db.query(Company).filter(Company.org_id == user.org_id).order_by(Company.id).all()
+    packs = []
+    skipped = []
     for company in companies:
-        actuals = db.query(Actual).filter(Actual.company_id == company.id).all()
-        kpis = compute_kpis([ActualRecord(a.period, a.category, a.amount) for a in actuals])
-        if not kpis:
+        if unmapped_accounts(db, company.id):
+            skipped.append(company.name)
             continue
-        latest = kpis[-1]
-        prior = kpis[-2] if len(kpis) > 1 else None
+        packs.append((load_pack_inputs(db, company.id), pack_fingerprint(db, company.id)))
+    audit_writer.submit(db, user.org_id, user.id, "portfolio_packs_generated", str(len(packs)))
+    response = StreamingResponse(
+        stream_portfolio_zip(packs, settings.pack_export_workers, skipped),
+        media_type="application/zip",
+    )
+    response.headers["Content-Disposition"] = "attachment; filename=portfolio_packs.zip"
+    return response
+
+
+def _dashboard_payload(db: Session, org_id: int) -> dict:
+    with tracer.start_as_current_span("dashboard.load_kpis") as span:
+        snapshots = load_latest_kpis(db, org_id)
+        span.set_attribute("dashboard.companies", len(snapshots))
+    summary = []
+    for company_name, snapshot in snapshots:
+        latest = snapshot.latest
+        prior = snapshot.prior
         revenue_change = (latest.revenue - prior.revenue) / prior.revenue if prior and prior.revenue else 0.0
         margin_change = latest.gross_margin - prior.gross_margin if prior else 0.0
         summary.append(
             {
-                "company": company.name,
+                "company": company_name,
                 "runway_months": latest.runway_months,
                 "revenue": latest.revenue,
                 "gross_margin": latest.gross_margin,
@@ -458,50 +689,71 @@ def portfolio_dashboard(
                 "gross_margin_change": margin_change,
             }
         )
-    risks = [
-        s
-        for s in summary
-        if s["runway_months"] < _org_setting(db, user.org_id).runway_risk_threshold
-        or s["revenue_change"] < _org_setting(db, user.org_id).revenue_drop_threshold
-        or s["gross_margin_change"] < _org_setting(db, user.org_id).margin_drop_threshold
-    ]
+    with tracer.start_as_current_span("dashboard.risks") as span:
+        thresholds = load_org_settings(db, org_id, fresh=True)
+        risks = [
+            s
+            for s in summary
+            if s["runway_months"] < thresholds.runway_risk_threshold
+            or s["revenue_change"] < thresholds.revenue_drop_threshold
+            or s["gross_margin_change"] < thresholds.margin_drop_threshold
+        ]
+        span.set_attribute("dashboard.companies", len(summary))
+        span.set_attribute("dashboard.risks", len(risks))
     return {"summary": summary, "risks": risks}
 
 
-@router.get("/audit/logs", response_model=list[AuditLogOut])
-def list_audit_logs(
+@router.get("/portfolio/dashboard")
+async def portfolio_dashboard(
+    if_none_match: str | None = Header(default=None),
+    user: Principal = Depends(
+        _require_roles(["org_admin", "analyst", "viewer"], _current_user_async)
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def _compute():
+        return await db.run_sync(_dashboard_payload, user.org_id)
+
+    return await _cached_json("dashboard", user.org_id, None, if_none_match, _compute)
+
+
+@router.get("/audit/logs", response_model=Page[AuditLogOut])
+async def list_audit_logs(
     action: str | None = None,
-    user: User = Depends(_require_roles(["org_admin", "analyst"])),
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = PageLimit,
+    user: Principal = Depends(_require_roles(["org_admin", "analyst"], _current_user_async)),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(AuditLog).filter(AuditLog.org_id == user.org_id)
+    query = select(AuditLog).where(AuditLog.org_id == user.org_id)
     if action:
-        query = query.filter(AuditLog.action == action)
-    return query.order_by(AuditLog.created_at.desc()).limit(200).all()
+        query = query.where(AuditLog.action == action)
+    if cursor:
+        created_at, after_id = decode_cursor(cursor, datetime, int)
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < (created_at, after_id))
+    rows = (
+        await db.scalars(
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1)
+        )
+    ).all()
+    return page(rows, limit, lambda row: (row.created_at, row.id))
 
 
 @router.get("/org/settings", response_model=OrgSettingsOut)
-def get_org_settings(user: User = Depends(_require_roles(["org_admin"])), db: Session = Depends(get_db)):
-    return _org_setting(db, user.org_id)
+def get_org_settings(user: Principal = Depends(_require_roles(["org_admin"])), db: Session = Depends(get_db)):
+    return load_org_settings(db, user.org_id)
 
 
 @router.put("/org/settings", response_model=OrgSettingsOut)
 def update_org_settings(
     payload: OrgSettingsUpdate,
-    user: User = Depends(_require_roles(["org_admin"])),
+    user: Principal = Depends(_require_roles(["org_admin"])),
     db: Session = Depends(get_db),
 ):
-    settings_row = db.query(OrganizationSetting).filter(OrganizationSetting.org_id == user.org_id).first()
-    if not settings_row:
-        settings_row = OrganizationSetting(org_id=user.org_id, **payload.model_dump())
-        db.add(settings_row)
-    else:
-        settings_row.runway_risk_threshold = payload.runway_risk_threshold
-        settings_row.revenue_drop_threshold = payload.revenue_drop_threshold
-        settings_row.margin_drop_threshold = payload.margin_drop_threshold
-    db.commit()
-    db.refresh(settings_row)
-    _log(db, user.org_id, user.id, "org_settings_updated", None)
+    # save_org_settings commits, taking the enlisted audit row with it.
+    record_audit(db, user.org_id, user.id, "org_settings_updated", None)
+    settings_row = save_org_settings(db, user.org_id, payload.model_dump())
+    bump_data_version(user.org_id)
     return settings_row
 
 
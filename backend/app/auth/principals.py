@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.entities import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user, safe to share across sessions."""
+
+    id: int
+    org_id: int
+    email: str
+    role: str
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.org_id, user.email, user.role, user.token_version or 0)
+
+
+class PrincipalCache:
+    """Bounded, short-TTL LRU of principals keyed by user id.
+
+    Entries are per process. Each one remembers the user's shared generation token from when it
+    was loaded and only hits while the caller presents the same token, so invalidate_principal()
+    in any worker retires every process's copy.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[Principal, float, bytes | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: int, token_version: int, generation: bytes | None = None
+    ) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                principal, expires_at, cached_generation = entry
+                if (
+                    expires_at > time.monotonic()
+                    and principal.token_version == token_version
+                    and cached_generation == generation
+                ):
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    record_cache("principal", True)
+                    return principal
+                del self._entries[user_id]
+            self.misses += 1
+            record_cache("principal", False)
+            return None
+
+    def put(self, principal: Principal, generation: bytes | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (
+                principal,
+                time.monotonic() + self.ttl_seconds,
+                generation,
+            )
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+principal_cache = PrincipalCache(
+    settings.principal_cache_max_entries, settings.principal_cache_ttl_seconds
+)
+
+
+def _generation_key(user_id: int) -> str:
+    return f"principal-generation:{user_id}"
+
+
+def principal_generation(user_id: int) -> bytes | None:
+    """Shared token that changes whenever ``user_id`` is invalidated; None until it first is."""
+    return get_cache().get(_generation_key(user_id))
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Retire every worker's cached principal for ``user_id``.
+
+    Call after the change has committed, so no worker can reload the old row under the new
+    generation.
+    """
+    get_cache().set(_generation_key(user_id), time.time_ns())
+    principal_cache.evict(user_id)
+
+
+def load_principal(db: Session, user_id: int, token_version: int) -> Principal | None:
+    """Principal for ``user_id``, from the cache when its entry is still current.
+
+    The generation is read before the user row, so a change that lands in between is cached
+    under the old generation and reloaded on the next request.
+    """
+    generation = principal_generation(user_id)
+    principal = principal_cache.get(user_id, token_version, generation)
+    if principal is not None:
+        return principal
+    user = db.get(User, user_id)
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.put(principal, generation)
+    return principal
+
+
+async def load_principal_async(
+    db: AsyncSession, user_id: int, token_version: int
+) -> Principal | None:
+    generation = await run_in_threadpool(principal_generation, user_id)
+    principal = principal_cache.get(user_id, token_version, generation)
+    if principal is not None:
+        return principal
+    user = await db.get(User, user_id)
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.put(principal, generation)
+    return principal
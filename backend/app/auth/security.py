@@ -17,7 +17,7 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
-def create_token(subject: str, expires_minutes: int) -> str:
+def create_token(subject: str, expires_minutes: int, token_version: int = 0) -> str:
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
-    payload: dict[str, Any] = {"sub": subject, "exp": expire}
+    payload: dict[str, Any] = {"sub": subject, "exp": expire, "ver": token_version}
     return jwt.encode(payload, settings.secret_key, algorithm="HS256")
@@ -0,0 +1,61 @@
+import threading
+import time
+from functools import lru_cache
+
+import redis
+
+from app.core.config import settings
+
+
+class MemoryCache:
+    """In-process stand-in for the subset of the Redis client the app uses.
+
+    Selected with ``CACHE_URL=memory://``; only suitable for tests and single-process runs.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(
+        self, key: str, value: bytes | str | int, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        if isinstance(value, str):
+            value = value.encode()
+        elif isinstance(value, int):
+            value = str(value).encode()
+        if nx and self.exists(key):
+            return None
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def exists(self, key: str) -> int:
+        return int(self.get(key) is not None)
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._data.clear()
+        return True
+
+
+@lru_cache
+def get_cache() -> "redis.Redis | MemoryCache":
+    if settings.cache_url.startswith("memory://"):
+        return MemoryCache()
+    return redis.Redis.from_url(settings.cache_url)
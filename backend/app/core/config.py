@@ -7,7 +7,28 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_minutes: int = 60 * 24 * 7
     database_url: str = "postgresql://prs:prs@db:5432/prs"
+    async_database_url: str | None = None
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 30 * 60
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_pre_ping: bool = True
     redis_url: str = "redis://redis:6379/0"
+    cache_url: str = "redis://redis:6379/1"
+    pack_cache_ttl_seconds: int = 60 * 60 * 24
+    pack_cache_max_bytes: int = 20 * 1024 * 1024
+    response_cache_ttl_seconds: int = 5 * 60
+    celery_task_always_eager: bool = False
+    pack_export_workers: int = 4
+    blob_store_dir: str = "/data/blobs"
+    audit_queue_size: int = 10_000
+    audit_batch_rows: int = 500
+    audit_flush_interval_seconds: float = 0.2
+    log_queue: bool = True
+    log_info_sample_rate: float = 1.0
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_entries: int = 10_000
+    org_settings_cache_ttl_seconds: float = 60.0
     environment: str = "dev"
     runway_risk_threshold: float = 6.0
     revenue_drop_threshold: float = -0.1
@@ -1,26 +1,111 @@
-import json
+import atexit
 import logging
-from datetime import datetime
+import queue
+import random
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
 
+import orjson
+
+from app.core.config import settings
 from app.core.request_id import get_request_id
 
+_listener: QueueListener | None = None
+
+
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
-            "request_id": get_request_id() or None,
+            "request_id": getattr(record, "request_id", None) or get_request_id() or None,
         }
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
-        return json.dumps(payload)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return orjson.dumps(payload, default=str).decode()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp the current request id on the record while still on the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id() or None
+        return True
+
+
+class InfoSampler(logging.Filter):
+    """Keep ``rate`` of INFO-and-below records; WARNING and above always pass.
+
+    Records inside a request are sampled by request id so a request's lines are kept or dropped
+    together.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.threshold = int(max(0.0, min(rate, 1.0)) * 0xFFFFFFFF)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.threshold >= 0xFFFFFFFF:
+            return True
+        request_id = getattr(record, "request_id", None) or get_request_id()
+        if request_id:
+            return zlib.crc32(request_id.encode()) <= self.threshold
+        return random.getrandbits(32) <= self.threshold
 
 
-def setup_logging() -> None:
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter())
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records with only the message merged, leaving JSON encoding to the listener.
+
+    The stock QueueHandler copies the record and runs the full formatter on the caller's thread;
+    this is the root's only handler, so the record is updated in place and only the message and
+    any traceback text are rendered before it crosses threads.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def setup_logging(stream: TextIO | None = None) -> None:
+    """Install the JSON root handler.
+
+    With ``LOG_QUEUE`` (default) records go through a queue to a listener thread that encodes
+    and writes them; otherwise the stream handler runs inline.
+    """
+    global _listener
+    stop_logging()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    if settings.log_queue:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        handler: logging.Handler = DeferredQueueHandler(records)
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = output
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(InfoSampler(settings.log_info_sample_rate))
     root = logging.getLogger()
     root.setLevel(logging.INFO)
     root.handlers = [handler]
+
+
+def stop_logging() -> None:
+    """Drain queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
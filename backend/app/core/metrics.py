@@ -0,0 +1,131 @@
+"""Prometheus instruments for the API and engine hot paths.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set before the process starts, prometheus_client keeps every
+value in per-process files in that directory and ``/metrics`` aggregates them, so any uvicorn
+worker (or pack process pool child) answers for the whole container. The directory must be
+emptied before the server starts.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# One-off commands (alembic, seeds, tests) skip the image CMD that prepares the directory, and
+# unlabelled instruments open their files as soon as they are built.
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+SIZE_CLASSES = (100, 1_000, 10_000, 100_000)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response byte, by route template",
+    ["method", "route", "status"],
+)
+PACK_BUILD_DURATION = Histogram(
+    "pack_build_duration_seconds",
+    "Time to render one company pack workbook",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+PACK_SIZE = Histogram(
+    "pack_size_bytes",
+    "Size of rendered company pack workbooks",
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6),
+)
+KPI_COMPUTE_DURATION = Histogram(
+    "kpi_compute_duration_seconds",
+    "Time to compute KPIs, by number of actual rows in",
+    ["size"],
+)
+FORECAST_DURATION = Histogram(
+    "forecast_duration_seconds",
+    "Time to run a forecast, by number of forecast rows out",
+    ["size"],
+)
+INGEST_ROWS = Counter("ingest_rows", "Actual rows ingested", ["format"])
+INGEST_THROUGHPUT = Histogram(
+    "ingest_rows_per_second",
+    "Rows per second for each actuals upload",
+    ["format"],
+    buckets=(1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5, 1e6),
+)
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to check a connection out of the pool, including any pre-ping",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Counter("db_pool_overflow", "Connections opened beyond pool_size", ["pool"])
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts", "Checkouts that gave up after pool_timeout", ["pool"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Cache lookups by cache and outcome", ["cache", "result"]
+)
+
+
+def size_class(rows: int) -> str:
+    """Coarse label for an input size, keeping histogram cardinality bounded."""
+    for bound in SIZE_CLASSES:
+        if rows <= bound:
+            return f"le_{bound}"
+    return f"gt_{SIZE_CLASSES[-1]}"
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition body and content type, aggregated across processes when multiprocess."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Observe request latency labelled with the matched route template, not the raw path."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
@@ -1,10 +1,10 @@
 import contextvars
 import uuid
-from typing import Callable
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.timing import RequestTimings, request_timings_ctx
 
 request_id_ctx = contextvars.ContextVar("request_id", default="")
 
@@ -13,13 +13,34 @@ def get_request_id() -> str:
     return request_id_ctx.get()
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = request.headers.get("X-Request-Id", str(uuid.uuid4()))
-        token = request_id_ctx.set(request_id)
+class RequestIdMiddleware:
+    """Tag each HTTP request with ``X-Request-Id`` and report ``Server-Timing``.
+
+    Plain ASGI, so streamed bodies pass straight through. The timing header is written with the
+    response start, so for streamed responses it covers the work done before the first byte.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = Headers(scope=scope).get("x-request-id") or str(uuid.uuid4())
+        timings = RequestTimings()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-Id"] = request_id
+                headers.append("Server-Timing", timings.header())
+            await send(message)
+
+        id_token = request_id_ctx.set(request_id)
+        timings_token = request_timings_ctx.set(timings)
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers)
         finally:
-            request_id_ctx.reset(token)
-        response.headers["X-Request-Id"] = request_id
-        return response
+            request_timings_ctx.reset(timings_token)
+            request_id_ctx.reset(id_token)
@@ -0,0 +1,66 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_QUERY_STARTS = "server_timing_query_starts"
+
+
+@dataclass
+class RequestTimings:
+    """Per-request duration buckets, shared by reference with threadpool and greenlet workers."""
+
+    started: float = field(default_factory=time.perf_counter)
+    durations: dict[str, float] = field(default_factory=lambda: {"db": 0.0, "compute": 0.0})
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        """``Server-Timing`` value in milliseconds: total so far, then each bucket."""
+        total = time.perf_counter() - self.started
+        metrics = [("total", total), *self.durations.items()]
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in metrics)
+
+
+request_timings_ctx: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def get_request_timings() -> RequestTimings | None:
+    return request_timings_ctx.get()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the block's wall time to the current request's ``name`` bucket; no-op outside one."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = request_timings_ctx.get()
+        if timings is not None:
+            timings.add(name, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info[_QUERY_STARTS].pop()
+    timings = request_timings_ctx.get()
+    if timings is not None:
+        timings.add("db", elapsed)
+
+
+def instrument_db_timing() -> None:
+    """Count cursor execution time on every engine, sync and async, towards the ``db`` bucket."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,61 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT, DB_POOL_IN_USE, DB_POOL_OVERFLOW, DB_POOL_TIMEOUTS
+
+
+class _TimedCheckout:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(pool=self.logging_name).inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_CHECKOUT.labels(pool=self.logging_name).observe(elapsed)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, name: str, asynchronous: bool = False) -> dict:
+    """create_engine() pool arguments from Settings; SQLite keeps its default pool."""
+    options = {"pool_pre_ping": settings.db_pool_pre_ping, "pool_logging_name": name}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    return {
+        **options,
+        "poolclass": TimedAsyncAdaptedQueuePool if asynchronous else TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
+def instrument_engine(engine: Engine, name: str) -> Engine:
+    """Report in-use and overflow connections for ``engine`` under ``pool=name``."""
+    @event.listens_for(engine, "connect")
+    def _count_overflow(dbapi_connection, connection_record):
+        if isinstance(engine.pool, QueuePool) and engine.pool.overflow() > 0:
+            DB_POOL_OVERFLOW.labels(pool=name).inc()
+
+    # Prometheus multiprocess gauges cannot be read through a callback, so in-use is tracked
+    # from pool events instead.
+    in_use = DB_POOL_IN_USE.labels(pool=name)
+    event.listen(engine, "checkout", lambda *args: in_use.inc())
+    event.listen(engine, "checkin", lambda *args: in_use.dec())
+
+    return engine
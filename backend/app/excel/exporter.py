@@ -1,6 +1,8 @@
+from dataclasses import fields
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Sequence
 
-import pandas as pd
 import xlsxwriter
 
 from app.services.finance import KPIResult
@@ -17,6 +19,10 @@ SHEETS = [
     "Sensitivity",
     "Notes",
 ]
+SIMULATION_SHEET = "Monte Carlo"
+KPI_COLUMNS = [f.name for f in fields(KPIResult)]
+TREND_COLUMNS = ["period", "revenue", "gross_margin", "ebitda", "runway_months"]
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 
 def build_workbook(
@@ -27,9 +33,69 @@ def build_workbook(
     scenario_results: list[dict[str, float]],
     scenario_deltas: list[dict[str, float]],
     sensitivity: list[dict[str, float]],
+    simulation: list[dict] | None = None,
 ) -> bytes:
     output = BytesIO()
-    workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    write_workbook(
+        output,
+        company_name,
+        kpis,
+        forecast,
+        scenarios,
+        scenario_results,
+        scenario_deltas,
+        sensitivity,
+        simulation,
+    )
+    return output.getvalue()
+
+
+def spool_workbook(
+    company_name: str,
+    kpis: list[KPIResult],
+    forecast: list[KPIResult],
+    scenarios: list[dict[str, float]],
+    scenario_results: list[dict[str, float]],
+    scenario_deltas: list[dict[str, float]],
+    sensitivity: list[dict[str, float]],
+    simulation: list[dict] | None = None,
+) -> SpooledTemporaryFile:
+    """Build the workbook in constant-memory mode into a spooled temp file, rewound for reading.
+
+    Rows are flushed to xlsxwriter's temp files as they are written and the finished file only
+    moves to disk once it outgrows SPOOL_MAX_BYTES. The caller closes the returned file.
+    """
+    output = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_workbook(
+        output,
+        company_name,
+        kpis,
+        forecast,
+        scenarios,
+        scenario_results,
+        scenario_deltas,
+        sensitivity,
+        simulation,
+        constant_memory=True,
+    )
+    output.seek(0)
+    return output
+
+
+def write_workbook(
+    output: BinaryIO,
+    company_name: str,
+    kpis: list[KPIResult],
+    forecast: list[KPIResult],
+    scenarios: list[dict[str, float]],
+    scenario_results: list[dict[str, float]],
+    scenario_deltas: list[dict[str, float]],
+    sensitivity: list[dict[str, float]],
+    simulation: list[dict] | None = None,
+    constant_memory: bool = False,
+) -> None:
+    options = {"constant_memory": True} if constant_memory else {"in_memory": True}
+    workbook = xlsxwriter.Workbook(output, options)
 
     summary = workbook.add_worksheet("Summary")
     summary.write("A1", "Company")
@@ -39,45 +105,34 @@ def build_workbook(
     summary.write("A3", "Latest Runway (months)")
     summary.write("B3", kpis[-1].runway_months if kpis else 0)
 
-    pnl_ws = workbook.add_worksheet("P&L Actuals")
-    pnl_df = pd.DataFrame([k.__dict__ for k in kpis])
-    _write_df(pnl_ws, pnl_df)
-
-    kpi_ws = workbook.add_worksheet("KPI Trends")
-    _write_df(kpi_ws, pnl_df[["period", "revenue", "gross_margin", "ebitda", "runway_months"]])
-
-    forecast_ws = workbook.add_worksheet("Forecast")
-    forecast_df = pd.DataFrame([k.__dict__ for k in forecast])
-    _write_df(forecast_ws, forecast_df)
-
-    scenarios_ws = workbook.add_worksheet("Scenarios")
-    scenarios_df = pd.DataFrame(scenarios)
-    _write_df(scenarios_ws, scenarios_df)
-
-    scenario_results_ws = workbook.add_worksheet("Scenario Comparison")
-    scenario_results_df = pd.DataFrame(scenario_results)
-    _write_df(scenario_results_ws, scenario_results_df)
-
-    scenario_deltas_ws = workbook.add_worksheet("Scenario Deltas")
-    scenario_deltas_df = pd.DataFrame(scenario_deltas)
-    _write_df(scenario_deltas_ws, scenario_deltas_df)
-
-    sensitivity_ws = workbook.add_worksheet("Sensitivity")
-    sensitivity_df = pd.DataFrame(sensitivity)
-    _write_df(sensitivity_ws, sensitivity_df)
+    _write_records(workbook.add_worksheet("P&L Actuals"), KPI_COLUMNS, kpis)
+    _write_records(workbook.add_worksheet("KPI Trends"), TREND_COLUMNS, kpis)
+    _write_records(workbook.add_worksheet("Forecast"), KPI_COLUMNS, forecast)
+    _write_dicts(workbook.add_worksheet("Scenarios"), scenarios)
+    _write_dicts(workbook.add_worksheet("Scenario Comparison"), scenario_results)
+    _write_dicts(workbook.add_worksheet("Scenario Deltas"), scenario_deltas)
+    _write_dicts(workbook.add_worksheet("Sensitivity"), sensitivity)
+    if simulation is not None:
+        _write_dicts(workbook.add_worksheet(SIMULATION_SHEET), simulation)
 
     notes_ws = workbook.add_worksheet("Notes")
     notes_ws.write("A1", "Generated by Portfolio Reporting Studio")
 
     workbook.close()
-    return output.getvalue()
 
 
-def _write_df(worksheet, df: pd.DataFrame) -> None:
-    if df.empty:
+def _write_records(worksheet, columns: list[str], records: Sequence[KPIResult]) -> None:
+    if not records:
+        return
+    worksheet.write_row(0, 0, columns)
+    for row_idx, record in enumerate(records, start=1):
+        worksheet.write_row(row_idx, 0, [getattr(record, column) for column in columns])
+
+
+def _write_dicts(worksheet, rows: Sequence[dict]) -> None:
+    if not rows:
         return
-    for col_idx, col in enumerate(df.columns):
-        worksheet.write(0, col_idx, col)
-    for row_idx, row in enumerate(df.itertuples(index=False), start=1):
-        for col_idx, value in enumerate(row):
-            worksheet.write(row_idx, col_idx, value)
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    worksheet.write_row(0, 0, columns)
+    for row_idx, row in enumerate(rows, start=1):
+        worksheet.write_row(row_idx, 0, [row.get(column) for column in columns])
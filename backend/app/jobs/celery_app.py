@@ -2,4 +2,7 @@ from celery import Celery
 
 from app.core.config import settings
 
-celery_app = Celery("prs", broker=settings.redis_url, backend=settings.redis_url)
+celery_app = Celery(
+    "prs", broker=settings.redis_url, backend=settings.redis_url, include=["app.jobs.tasks"]
+)
+celery_app.conf.task_always_eager = settings.celery_task_always_eager
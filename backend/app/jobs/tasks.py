@@ -0,0 +1,18 @@
+from app.db.session import SessionLocal
+from app.jobs.celery_app import celery_app
+from app.services.packs import build_company_pack, cache_pack
+
+
+@celery_app.task(name="packs.build")
+def build_pack(company_id: int, fingerprint: str, simulate: bool = False) -> int:
+    db = SessionLocal()
+    try:
+        data = build_company_pack(db, company_id, simulate)
+    finally:
+        db.close()
+    if not cache_pack(company_id, fingerprint, data):
+        raise ValueError(
+            f"Pack is {len(data)} bytes, over PACK_CACHE_MAX_BYTES; "
+            f"download it from /companies/{company_id}/pack instead"
+        )
+    return len(data)
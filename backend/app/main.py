@@ -1,17 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 
 from app.api.routes import router
 from app.api.ui import router as ui_router
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.metrics import MetricsMiddleware, render_metrics
 from app.core.request_id import RequestIdMiddleware
+from app.core.timing import instrument_db_timing
+from app.db.session import async_engine, engine
+from app.services.audit import audit_writer
+from app.services.packs import pack_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pack_pool.get()
+    yield
+    pack_pool.shutdown()
+    audit_writer.stop()
+
 
 setup_logging()
-app = FastAPI(title=settings.app_name)
+instrument_db_timing()
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 app.add_middleware(RequestIdMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(router)
 app.include_router(ui_router)
 
@@ -19,8 +38,15 @@ app.mount("/static", StaticFiles(directory="app/templates"), name="static")
 app.state.templates = Jinja2Templates(directory="app/templates")
 
 FastAPIInstrumentor.instrument_app(app)
+SQLAlchemyInstrumentor().instrument(engines=[engine, async_engine.sync_engine])
 
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
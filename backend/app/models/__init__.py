@@ -2,6 +2,7 @@ from app.models.entities import (
     Actual,
     AuditLog,
     Company,
+    CompanyKPI,
     Mapping,
     Organization,
     OrganizationSetting,
@@ -14,6 +15,7 @@ __all__ = [
     "Actual",
     "AuditLog",
     "Company",
+    "CompanyKPI",
     "Mapping",
     "Organization",
     "OrganizationSetting",
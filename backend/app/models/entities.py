@@ -1,5 +1,6 @@
 from datetime import datetime, date
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -7,7 +8,9 @@ from sqlalchemy import (
     Date,
     Float,
     ForeignKey,
+    Index,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 
@@ -34,6 +37,7 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(50), default="analyst")
+    token_version = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     organization = relationship("Organization", back_populates="users")
@@ -41,6 +45,7 @@ class User(Base):
 
 class Company(Base):
     __tablename__ = "companies"
+    __table_args__ = (Index("ix_companies_org_id", "org_id"),)
 
     id = Column(Integer, primary_key=True)
     org_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
@@ -55,6 +60,7 @@ class Company(Base):
 
 class Actual(Base):
     __tablename__ = "actuals"
+    __table_args__ = (Index("ix_actuals_company_period", "company_id", "period"),)
 
     id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -66,18 +72,45 @@ class Actual(Base):
     company = relationship("Company", back_populates="actuals")
 
 
+class CompanyKPI(Base):
+    __tablename__ = "company_kpis"
+    __table_args__ = (
+        UniqueConstraint("company_id", "period", name="uq_company_kpis_company_period"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    period = Column(Date, nullable=False)
+    revenue = Column(Float, nullable=False)
+    gross_profit = Column(Float, nullable=False)
+    gross_margin = Column(Float, nullable=False)
+    opex = Column(Float, nullable=False)
+    ebitda = Column(Float, nullable=False)
+    burn = Column(Float, nullable=False)
+    cash_balance = Column(Float, nullable=False)
+    runway_months = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Upload(Base):
     __tablename__ = "uploads"
+    __table_args__ = (Index("ix_uploads_company_sha256", "company_id", "sha256"),)
 
     id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
-    raw_text = Column(Text, nullable=False)
+    # NULL only for Parquet uploads that predate the blob store and kept no body.
+    sha256 = Column(String(64), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    row_count = Column(Integer, nullable=True)
 
 
 class Mapping(Base):
     __tablename__ = "mappings"
+    __table_args__ = (
+        UniqueConstraint("company_id", "source_account", name="uq_mappings_company_source"),
+    )
 
     id = Column(Integer, primary_key=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -101,6 +134,10 @@ class Scenario(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_org_created", "org_id", "created_at"),
+        Index("ix_audit_logs_org_action_created", "org_id", "action", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     org_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
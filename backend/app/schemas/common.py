@@ -1,5 +1,17 @@
 from datetime import date, datetime
-from pydantic import BaseModel
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field, model_validator
+
+T = TypeVar("T")
+
+# paths x months per simulation request: the default 10k paths over 36 months.
+SIMULATION_MAX_CELLS = 10_000 * 36
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
 
 
 class CompanyCreate(BaseModel):
@@ -36,6 +48,26 @@ class ScenarioOut(ScenarioCreate):
         from_attributes = True
 
 
+class DistributionIn(BaseModel):
+    kind: str
+    params: list[float]
+
+
+class SimulationCreate(BaseModel):
+    revenue_growth: DistributionIn
+    gross_margin: DistributionIn
+    opex_growth: DistributionIn
+    months: int = Field(36, ge=1, le=120)
+    paths: int = Field(10_000, ge=1, le=100_000)
+    seed: int | None = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def _within_budget(self) -> "SimulationCreate":
+        if self.paths * self.months > SIMULATION_MAX_CELLS:
+            raise ValueError(f"paths x months must not exceed {SIMULATION_MAX_CELLS:,}.")
+        return self
+
+
 class UserCreate(BaseModel):
     email: str
     password: str
@@ -74,3 +106,7 @@ class AuditLogOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MappingStatusPage(Page[str]):
+    mapped_count: int
@@ -0,0 +1,119 @@
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.entities import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def _row(org_id: int, user_id: int | None, action: str, detail: str | None) -> dict:
+    return {
+        "org_id": org_id,
+        "user_id": user_id,
+        "action": action,
+        "detail": detail,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def record_audit(
+    db: Session, org_id: int, user_id: int | None, action: str, detail: str | None = None
+) -> None:
+    """Enlist an audit row in the caller's unit of work; it commits with the business write."""
+    db.add(AuditLog(**_row(org_id, user_id, action, detail)))
+
+
+class AuditWriter:
+    """Bounded queue of audit rows written in batched multi-row inserts by a daemon thread.
+
+    For requests that have no transaction of their own to enlist in. A full queue blocks the
+    submitter (backpressure) instead of dropping rows; ``max_queue=0`` commits the row on the
+    request's own session instead, as tests running on a single shared connection need.
+    """
+
+    def __init__(self, max_queue: int, batch_rows: int, flush_interval: float) -> None:
+        self.max_queue = max_queue
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[tuple[Engine, dict] | None] = queue.Queue(max(max_queue, 1))
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self, db: Session, org_id: int, user_id: int | None, action: str, detail: str | None = None
+    ) -> None:
+        if self.max_queue <= 0:
+            record_audit(db, org_id, user_id, action, detail)
+            db.commit()
+            return
+        self._ensure_started()
+        self._queue.put((db.get_bind(), _row(org_id, user_id, action, detail)))
+
+    def flush(self) -> None:
+        """Block until every submitted row has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        """Flush and stop the writer thread; safe to call more than once."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item] if item is not None else []
+            stopping = item is None
+            while not stopping and len(batch) < self.batch_rows:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Failed to write %d audit rows", len(batch))
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    @staticmethod
+    def _write(items: list[tuple[Engine, dict]]) -> None:
+        by_engine: dict[Engine, list[dict]] = {}
+        for engine, row in items:
+            by_engine.setdefault(engine, []).append(row)
+        for engine, rows in by_engine.items():
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog), rows)
+
+
+audit_writer = AuditWriter(
+    settings.audit_queue_size, settings.audit_batch_rows, settings.audit_flush_interval_seconds
+)
+atexit.register(audit_writer.stop)
@@ -0,0 +1,70 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+from app.core.config import settings
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def sha256_stream(stream: BinaryIO) -> tuple[str, int]:
+    """Hex SHA-256 and byte size of ``stream``, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := stream.read(HASH_CHUNK_BYTES):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+class BlobStore(Protocol):
+    def exists(self, key: str) -> bool: ...
+
+    def put(self, key: str, stream: BinaryIO) -> None: ...
+
+    def open(self, key: str) -> BinaryIO: ...
+
+
+class LocalBlobStore:
+    """Gzip-compressed blobs on the local filesystem, fanned out by the first two hex digits."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.gz"
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def put(self, key: str, stream: BinaryIO) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stream.seek(0)
+        # Write beside the target and rename so readers never see a partial blob.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                shutil.copyfileobj(stream, out, HASH_CHUNK_BYTES)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        finally:
+            stream.seek(0)
+
+    def open(self, key: str) -> BinaryIO:
+        return gzip.open(self._path(key), "rb")
+
+
+@lru_cache
+def get_blob_store() -> BlobStore:
+    return LocalBlobStore(settings.blob_store_dir)
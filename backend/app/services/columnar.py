@@ -0,0 +1,118 @@
+from itertools import islice
+from typing import Iterable, Iterator, Literal, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.metrics import FORECAST_DURATION, size_class
+from app.services.finance import KPIResult, forecast_frame
+from app.services.kpi_store import KPI_COLUMNS
+
+ColumnarFormat = Literal["arrow", "parquet"]
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+PARQUET_COMPRESSION = "zstd"
+BATCH_ROWS = 5_000
+METRIC_COLUMNS = KPI_COLUMNS[1:]
+
+ACTUAL_SCHEMA = pa.schema(
+    [
+        ("company_id", pa.int64()),
+        ("period", pa.date32()),
+        ("category", pa.string()),
+        ("amount", pa.float64()),
+    ]
+)
+KPI_SCHEMA = pa.schema(
+    [("company_id", pa.int64()), ("period", pa.date32())]
+    + [(column, pa.float64()) for column in METRIC_COLUMNS]
+)
+FORECAST_SCHEMA = pa.schema(
+    [("scenario", pa.string()), ("period", pa.date32())]
+    + [(column, pa.float64()) for column in METRIC_COLUMNS]
+)
+
+
+def record_batches(
+    schema: pa.Schema, rows: Iterable[Sequence], batch_rows: int = BATCH_ROWS
+) -> Iterator[pa.RecordBatch]:
+    """Transpose streamed rows into typed record batches of ``batch_rows``."""
+    rows = iter(rows)
+    while chunk := list(islice(rows, batch_rows)):
+        columns = zip(*chunk, strict=True)
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(columns, schema, strict=True)
+        ]
+        yield pa.record_batch(arrays, schema=schema)
+
+
+def forecast_table(
+    last: KPIResult, months: int, scenarios: dict[str, dict[str, float]]
+) -> pa.Table:
+    """Forecast every scenario in one forecast_frame call; one row per scenario and month."""
+    names = list(scenarios)
+    with FORECAST_DURATION.labels(size=size_class(months * len(names))).time():
+        frame = forecast_frame(
+            last,
+            months,
+            **{
+                driver: np.array([scenarios[name][driver] for name in names])
+                for driver in ("revenue_growth", "gross_margin", "opex_growth")
+            },
+        )
+    return pa.table(
+        {
+            "scenario": np.repeat(names, months),
+            "period": np.tile(frame.period, len(names)),
+            **{column: getattr(frame, column).ravel() for column in METRIC_COLUMNS},
+        },
+        schema=FORECAST_SCHEMA,
+    )
+
+
+class _ChunkSink:
+    """Write-only, non-seekable sink for Arrow writers; ``take`` drains what was written."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def encode_batches(
+    export_format: ColumnarFormat, schema: pa.Schema, batches: Iterable[pa.RecordBatch]
+) -> Iterator[bytes]:
+    """Arrow IPC stream or Parquet (one row group per batch), yielded as each batch is written."""
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
@@ -0,0 +1,94 @@
+import csv
+import json
+from datetime import date
+from io import StringIO
+from typing import Iterable, Iterator, Literal, Sequence
+
+import pyarrow as pa
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.entities import Actual, Company, CompanyKPI
+from app.services import columnar
+from app.services.columnar import ACTUAL_SCHEMA, KPI_SCHEMA
+
+ExportFormat = Literal["csv", "ndjson", "arrow", "parquet"]
+
+EXPORT_BATCH_ROWS = columnar.BATCH_ROWS
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson", **columnar.MEDIA_TYPES}
+ACTUAL_COLUMNS = ACTUAL_SCHEMA.names
+KPI_EXPORT_COLUMNS = KPI_SCHEMA.names
+MAPPING_SCHEMA = pa.schema([("source_account", pa.string()), ("canonical_category", pa.string())])
+
+
+def stream_rows(bind: Engine | Connection, statement: Select) -> Iterator[Sequence]:
+    """Yield ``statement``'s rows in EXPORT_BATCH_ROWS batches from a server-side cursor.
+
+    The rows are read while the response body streams, after the route has returned, so they
+    come from a session opened here rather than the request's, which may already be closed.
+    """
+    with Session(bind) as db:
+        yield from db.execute(statement.execution_options(yield_per=EXPORT_BATCH_ROWS))
+
+
+def _stream(db: Session, model, columns: list[str], org_id: int, company_id: int | None):
+    statement: Select = (
+        select(*(getattr(model, column) for column in columns))
+        .join(Company, Company.id == model.company_id)
+        .where(Company.org_id == org_id)
+    )
+    if company_id is not None:
+        statement = statement.where(model.company_id == company_id)
+    statement = statement.order_by(model.company_id, model.period, model.id)
+    return stream_rows(db.get_bind(), statement)
+
+
+def actual_rows(db: Session, org_id: int, company_id: int | None = None) -> Iterable[Sequence]:
+    return _stream(db, Actual, ACTUAL_COLUMNS, org_id, company_id)
+
+
+def kpi_rows(db: Session, org_id: int, company_id: int | None = None) -> Iterable[Sequence]:
+    return _stream(db, CompanyKPI, KPI_EXPORT_COLUMNS, org_id, company_id)
+
+
+def encode_csv(columns: list[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _json_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_ndjson(columns: list[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    lines: list[str] = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row, strict=True)), default=_json_value))
+        if len(lines) == EXPORT_BATCH_ROWS:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def encode_rows(
+    export_format: ExportFormat, schema: pa.Schema, rows: Iterable[Sequence]
+) -> Iterator[bytes]:
+    """Encode rows lazily, one EXPORT_BATCH_ROWS chunk at a time."""
+    if export_format in columnar.MEDIA_TYPES:
+        batches = columnar.record_batches(schema, rows, EXPORT_BATCH_ROWS)
+        return columnar.encode_batches(export_format, schema, batches)
+    if export_format == "ndjson":
+        return encode_ndjson(schema.names, rows)
+    return encode_csv(schema.names, rows)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, fields
 from datetime import date
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
 CANONICAL_CATEGORIES = [
@@ -37,91 +39,222 @@ class KPIResult:
     runway_months: float
 
 
-def _safe_divide(numerator: float, denominator: float) -> float:
-    return numerator / denominator if denominator else 0.0
+OPEX_CATEGORIES = ["Sales & Marketing", "R&D", "G&A", "Other OpEx"]
+RUNWAY_WINDOW = 3
+_CATEGORY_INDEX = {category: idx for idx, category in enumerate(CANONICAL_CATEGORIES)}
+
+
+@dataclass(frozen=True)
+class KPIFrame:
+    """Columnar KPI table: one NumPy array per KPIResult field, sorted by (company_id, period).
+
+    Forecast frames may carry leading driver axes; ``to_results`` expects one-dimensional columns.
+    """
+
+    period: np.ndarray
+    revenue: np.ndarray
+    gross_profit: np.ndarray
+    gross_margin: np.ndarray
+    opex: np.ndarray
+    ebitda: np.ndarray
+    burn: np.ndarray
+    cash_balance: np.ndarray
+    runway_months: np.ndarray
+    company_id: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.period)
+
+    def to_results(self, rows: np.ndarray | slice = slice(None)) -> list[KPIResult]:
+        columns = [getattr(self, f.name)[rows] for f in fields(KPIResult)]
+        columns[0] = columns[0].astype(object)
+        return [KPIResult(*row) for row in zip(*(c.tolist() for c in columns), strict=True)]
+
+
+@dataclass(frozen=True)
+class CompanyKPISnapshot:
+    company_id: int
+    latest: KPIResult
+    prior: KPIResult | None
+
+
+def _pivot_actuals(
+    keys: np.ndarray, categories: np.ndarray, amounts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    unique_keys, key_idx = np.unique(keys, return_inverse=True)
+    unique_categories, category_idx = np.unique(categories, return_inverse=True)
+    codes = np.array(
+        [_CATEGORY_INDEX.get(c, -1) for c in unique_categories.tolist()], dtype=np.intp
+    )
+    category_codes = codes[category_idx]
+    known = category_codes >= 0
+    matrix = np.zeros((len(unique_keys), len(CANONICAL_CATEGORIES)))
+    np.add.at(matrix, (key_idx[known], category_codes[known]), amounts[known])
+    return unique_keys, matrix
+
+
+def _group_starts(company_ids: np.ndarray) -> np.ndarray:
+    if not len(company_ids):
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, company_ids[1:] != company_ids[:-1]])
+
+
+def _trailing_mean(values: np.ndarray, window: int, position: np.ndarray) -> np.ndarray:
+    """Mean of the last ``window`` values, never reaching back past the start of a group.
+
+    ``position`` is each row's offset from the start of its group (company).
+    """
+    total = np.zeros_like(values)
+    for offset in range(window - 1, 0, -1):
+        shifted = np.r_[np.zeros(offset), values][: len(values)]
+        total += np.where(position >= offset, shifted, 0.0)
+    total += values
+    return total / np.minimum(position + 1, window)
+
+
+def _kpi_frame(
+    periods: np.ndarray, matrix: np.ndarray, company_ids: np.ndarray | None = None
+) -> KPIFrame:
+    column = {category: matrix[:, idx] for category, idx in _CATEGORY_INDEX.items()}
+    revenue = column["Revenue"]
+    gross_profit = revenue - column["COGS"]
+    gross_margin = np.divide(
+        gross_profit, revenue, out=np.zeros_like(revenue), where=revenue != 0
+    )
+    opex = column[OPEX_CATEGORIES[0]].copy()
+    for category in OPEX_CATEGORIES[1:]:
+        opex += column[category]
+    ebitda = gross_profit - opex
+    burn = np.maximum(0.0, -ebitda)
+    cash_balance = column["Cash"]
+    position = np.arange(len(periods))
+    if company_ids is not None:
+        starts = _group_starts(company_ids)
+        position = position - np.repeat(starts, np.diff(np.r_[starts, len(periods)]))
+    avg_burn = _trailing_mean(burn, RUNWAY_WINDOW, position)
+    runway = cash_balance / np.maximum(1.0, avg_burn)
+    return KPIFrame(
+        period=periods,
+        revenue=revenue,
+        gross_profit=gross_profit,
+        gross_margin=gross_margin,
+        opex=opex,
+        ebitda=ebitda,
+        burn=burn,
+        cash_balance=cash_balance,
+        runway_months=runway,
+        company_id=company_ids,
+    )
+
+
+def compute_kpi_frame(actuals: Iterable[ActualRecord]) -> KPIFrame:
+    rows = [(a.period, a.category, a.amount) for a in actuals]
+    periods = np.array([r[0] for r in rows], dtype="datetime64[D]")
+    categories = np.array([r[1] for r in rows], dtype=object)
+    amounts = np.array([r[2] for r in rows], dtype=float)
+    unique_periods, matrix = _pivot_actuals(periods, categories, amounts)
+    return _kpi_frame(unique_periods, matrix)
 
 
 def compute_kpis(actuals: Iterable[ActualRecord]) -> list[KPIResult]:
-    df = pd.DataFrame([a.__dict__ for a in actuals])
-    if df.empty:
+    return compute_kpi_frame(actuals).to_results()
+
+
+def compute_portfolio_kpi_frame(actuals: pd.DataFrame) -> KPIFrame:
+    """KPIs for many companies at once from a (company_id, period, category, amount) frame."""
+    company_ids = actuals["company_id"].to_numpy(dtype=np.int64)
+    periods = pd.to_datetime(actuals["period"]).to_numpy().astype("datetime64[D]")
+    unique_periods, period_idx = np.unique(periods, return_inverse=True)
+    keys = company_ids * max(1, len(unique_periods)) + period_idx
+    unique_keys, matrix = _pivot_actuals(
+        keys,
+        actuals["category"].to_numpy(dtype=object),
+        actuals["amount"].to_numpy(dtype=float),
+    )
+    stride = max(1, len(unique_periods))
+    return _kpi_frame(unique_periods[unique_keys % stride], matrix, unique_keys // stride)
+
+
+def compute_portfolio_kpis(actuals: pd.DataFrame) -> list[CompanyKPISnapshot]:
+    """Latest and prior-period KPIs for every company, ordered by company_id."""
+    frame = compute_portfolio_kpi_frame(actuals)
+    if not len(frame):
         return []
-    grouped = df.pivot_table(index="period", columns="category", values="amount", aggfunc="sum").fillna(0)
-    results: list[KPIResult] = []
-    for period, row in grouped.iterrows():
-        revenue = float(row.get("Revenue", 0))
-        cogs = float(row.get("COGS", 0))
-        gross_profit = revenue - cogs
-        gross_margin = _safe_divide(gross_profit, revenue)
-        opex = float(row.get("Sales & Marketing", 0)) + float(row.get("R&D", 0)) + float(
-            row.get("G&A", 0)
-        ) + float(row.get("Other OpEx", 0))
-        ebitda = gross_profit - opex
-        cash_balance = float(row.get("Cash", 0))
-        burn = max(0.0, -ebitda)
-        results.append(
-            KPIResult(
-                period=period,
-                revenue=revenue,
-                gross_profit=gross_profit,
-                gross_margin=gross_margin,
-                opex=opex,
-                ebitda=ebitda,
-                burn=burn,
-                cash_balance=cash_balance,
-                runway_months=0.0,
-            )
-        )
-    results.sort(key=lambda r: r.period)
-    for idx, result in enumerate(results):
-        recent = results[max(0, idx - 2) : idx + 1]
-        avg_burn = sum(r.burn for r in recent) / max(1, len(recent))
-        runway = result.cash_balance / max(1.0, avg_burn)
-        results[idx] = KPIResult(
-            period=result.period,
-            revenue=result.revenue,
-            gross_profit=result.gross_profit,
-            gross_margin=result.gross_margin,
-            opex=result.opex,
-            ebitda=result.ebitda,
-            burn=result.burn,
-            cash_balance=result.cash_balance,
-            runway_months=runway,
-        )
-    return results
+    starts = _group_starts(frame.company_id)
+    ends = np.r_[starts[1:], len(frame)] - 1
+    latest = frame.to_results(ends)
+    prior_rows = np.maximum(ends - 1, starts)
+    prior = frame.to_results(prior_rows)
+    has_prior = (ends > starts).tolist()
+    return [
+        CompanyKPISnapshot(company_id, latest[idx], prior[idx] if has_prior[idx] else None)
+        for idx, company_id in enumerate(frame.company_id[ends].tolist())
+    ]
 
 
-def forecast(base_kpis: list[KPIResult], months: int, revenue_growth: float, gross_margin: float, opex_growth: float) -> list[KPIResult]:
+def _compound(start: float, growth: np.ndarray, months: int) -> np.ndarray:
+    steps = np.broadcast_to((1 + growth)[..., None], growth.shape + (months,))
+    seeded = np.concatenate([np.full(growth.shape + (1,), start), steps], axis=-1)
+    return np.cumprod(seeded, axis=-1)[..., 1:]
+
+
+def _forecast_periods(last_period: date, months: int) -> np.ndarray:
+    start = np.datetime64(last_period, "M")
+    return (start + np.arange(1, months + 1)).astype("datetime64[D]")
+
+
+def forecast_frame(
+    last: KPIResult,
+    months: int,
+    revenue_growth: float | np.ndarray,
+    gross_margin: float | np.ndarray,
+    opex_growth: float | np.ndarray,
+) -> KPIFrame:
+    """Forecast every combination of the (broadcast) drivers at once.
+
+    Metric arrays have shape ``(*drivers, months)``; ``period`` has shape ``(months,)``. Revenue
+    and opex compound as cumulative products and cash runs down as a cumulative sum, in the same
+    operation order as a month-by-month loop, so results match ``forecast`` exactly.
+    """
+    revenue_growth, gross_margin, opex_growth = np.broadcast_arrays(
+        *(np.asarray(driver, dtype=float) for driver in (revenue_growth, gross_margin, opex_growth))
+    )
+    shape = revenue_growth.shape + (months,)
+    revenue = _compound(last.revenue, revenue_growth, months)
+    margin = np.broadcast_to(gross_margin[..., None], shape)
+    gross_profit = revenue * margin
+    opex = _compound(last.opex, opex_growth, months)
+    ebitda = gross_profit - opex
+    burn = np.maximum(0.0, -ebitda)
+    # Burn is never negative, so once cash reaches zero the unclamped running total stays <= 0.
+    opening_cash = np.full(revenue_growth.shape + (1,), last.cash_balance)
+    seeded = np.concatenate([opening_cash, -burn], axis=-1)
+    cash = np.maximum(0.0, np.cumsum(seeded, axis=-1)[..., 1:])
+    runway = cash / np.maximum(1.0, burn)
+    return KPIFrame(
+        period=_forecast_periods(last.period, months),
+        revenue=revenue,
+        gross_profit=gross_profit,
+        gross_margin=margin,
+        opex=opex,
+        ebitda=ebitda,
+        burn=burn,
+        cash_balance=cash,
+        runway_months=runway,
+    )
+
+
+def forecast(
+    base_kpis: list[KPIResult],
+    months: int,
+    revenue_growth: float,
+    gross_margin: float,
+    opex_growth: float,
+) -> list[KPIResult]:
     if not base_kpis:
         return []
-    last = base_kpis[-1]
-    period = last.period
-    results: list[KPIResult] = []
-    revenue = last.revenue
-    opex = last.opex
-    cash = last.cash_balance
-    for _ in range(months):
-        period = (period.replace(day=1) + pd.DateOffset(months=1)).date()
-        revenue *= 1 + revenue_growth
-        gross_profit = revenue * gross_margin
-        opex *= 1 + opex_growth
-        ebitda = gross_profit - opex
-        burn = max(0.0, -ebitda)
-        cash = max(0.0, cash - burn)
-        runway = cash / max(1.0, burn)
-        results.append(
-            KPIResult(
-                period=period,
-                revenue=revenue,
-                gross_profit=gross_profit,
-                gross_margin=gross_margin,
-                opex=opex,
-                ebitda=ebitda,
-                burn=burn,
-                cash_balance=cash,
-                runway_months=runway,
-            )
-        )
-    return results
+    frame = forecast_frame(base_kpis[-1], months, revenue_growth, gross_margin, opex_growth)
+    return frame.to_results()
 
 
 def sensitivity_grid(
@@ -131,10 +264,103 @@ def sensitivity_grid(
     opex_growth: float,
     months: int = 12,
 ) -> list[dict[str, float]]:
-    grid: list[dict[str, float]] = []
-    for rg in revenue_growth_range:
-        for gm in gross_margin_range:
-            forecasted = forecast(base_kpis, months, rg, gm, opex_growth)
-            runway = forecasted[-1].runway_months if forecasted else 0.0
-            grid.append({"revenue_growth": rg, "gross_margin": gm, "runway_months": runway})
-    return grid
+    if base_kpis and months:
+        frame = forecast_frame(
+            base_kpis[-1],
+            months,
+            np.asarray(revenue_growth_range, dtype=float)[:, None],
+            np.asarray(gross_margin_range, dtype=float)[None, :],
+            opex_growth,
+        )
+        runways = frame.runway_months[..., -1].ravel().tolist()
+    else:
+        runways = [0.0] * (len(revenue_growth_range) * len(gross_margin_range))
+    pairs = ((rg, gm) for rg in revenue_growth_range for gm in gross_margin_range)
+    return [
+        {"revenue_growth": rg, "gross_margin": gm, "runway_months": runway}
+        for (rg, gm), runway in zip(pairs, runways, strict=True)
+    ]
+
+
+_DISTRIBUTION_PARAMS = {"fixed": 1, "normal": 2, "uniform": 2, "triangular": 3}
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """A driver distribution: ``fixed`` (value), ``normal`` (mean, std), ``uniform`` (low, high)
+    or ``triangular`` (low, mode, high)."""
+
+    kind: str
+    params: tuple[float, ...]
+
+    def __post_init__(self) -> None:
+        expected = _DISTRIBUTION_PARAMS.get(self.kind)
+        if expected is None:
+            raise ValueError(f"Unknown distribution '{self.kind}'.")
+        if len(self.params) != expected:
+            raise ValueError(f"Distribution '{self.kind}' takes {expected} parameter(s).")
+        if not all(math.isfinite(param) for param in self.params):
+            raise ValueError(f"Distribution '{self.kind}' parameters must be finite.")
+        if self.kind == "normal" and self.params[1] < 0:
+            raise ValueError("Normal std must not be negative.")
+        if self.kind == "uniform" and self.params[0] > self.params[1]:
+            raise ValueError("Uniform low must not exceed high.")
+        if self.kind == "triangular":
+            low, mode, high = self.params
+            if not low <= mode <= high or low == high:
+                raise ValueError("Triangular needs low <= mode <= high with low < high.")
+
+    def sample(self, rng: np.random.Generator, size: tuple[int, ...]) -> np.ndarray:
+        if self.kind == "fixed":
+            return np.full(size, self.params[0], dtype=float)
+        return getattr(rng, self.kind)(*self.params, size=size)
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    period: np.ndarray
+    percentiles: tuple[float, ...]
+    runway_percentiles: np.ndarray
+    cash_out_probability: np.ndarray
+
+    def to_rows(self) -> list[dict]:
+        rows = []
+        for idx, period in enumerate(self.period.astype(object).tolist()):
+            row = {"period": period}
+            for pct, values in zip(self.percentiles, self.runway_percentiles, strict=True):
+                row[f"runway_p{pct:g}"] = float(values[idx])
+            row["cash_out_probability"] = float(self.cash_out_probability[idx])
+            rows.append(row)
+        return rows
+
+
+def simulate_forecast(
+    last: KPIResult,
+    months: int,
+    revenue_growth: Distribution,
+    gross_margin: Distribution,
+    opex_growth: Distribution,
+    paths: int = 10_000,
+    seed: int | None = None,
+    percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+) -> SimulationResult:
+    """Monte Carlo forecast: every driver is redrawn per path and per month.
+
+    All paths are advanced together as ``(paths, months)`` arrays from one seeded generator, so
+    the same seed always yields the same result.
+    """
+    rng = np.random.default_rng(seed)
+    size = (paths, months)
+    revenue = last.revenue * np.cumprod(1 + revenue_growth.sample(rng, size), axis=1)
+    gross_profit = revenue * gross_margin.sample(rng, size)
+    opex = last.opex * np.cumprod(1 + opex_growth.sample(rng, size), axis=1)
+    burn = np.maximum(0.0, opex - gross_profit)
+    cash = np.maximum(0.0, last.cash_balance - np.cumsum(burn, axis=1))
+    runway = cash / np.maximum(1.0, burn)
+    return SimulationResult(
+        period=_forecast_periods(last.period, months),
+        percentiles=tuple(percentiles),
+        runway_percentiles=np.percentile(runway, percentiles, axis=0),
+        cash_out_probability=(cash <= 0.0).mean(axis=0),
+    )
@@ -0,0 +1,135 @@
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import BinaryIO, Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.metrics import INGEST_ROWS, INGEST_THROUGHPUT
+from app.models.entities import Actual
+from app.services.finance import CANONICAL_CATEGORIES
+
+REQUIRED_COLUMNS = {"period", "category", "amount"}
+CHUNK_ROWS = 50_000
+
+
+class IngestError(ValueError):
+    pass
+
+
+@dataclass
+class IngestResult:
+    rows: int = 0
+    periods: set[date] = field(default_factory=set)
+
+
+def _canonical_chunk(chunk: pd.DataFrame, mappings: dict[str, str]) -> pd.DataFrame:
+    if not REQUIRED_COLUMNS.issubset(chunk.columns):
+        raise IngestError("CSV must include period, category, amount")
+    source = chunk["category"].astype(str)
+    category = source.where(source.isin(CANONICAL_CATEGORIES), source.map(mappings))
+    unmapped = category.isna()
+    if unmapped.any():
+        raise IngestError(
+            f"Category '{source[unmapped].iloc[0]}' missing mapping to canonical schema."
+        )
+    period = pd.to_datetime(chunk["period"], format="%Y-%m-%d", errors="coerce")
+    if period.isna().any():
+        raise IngestError(f"Invalid period '{chunk['period'][period.isna()].iloc[0]}'.")
+    amount = pd.to_numeric(chunk["amount"], errors="coerce")
+    if amount.isna().any():
+        raise IngestError(f"Invalid amount '{chunk['amount'][amount.isna()].iloc[0]}'.")
+    return pd.DataFrame({"period": period.dt.date, "category": category, "amount": amount})
+
+
+def _csv_chunks(stream: BinaryIO, chunk_rows: int) -> Iterable[pd.DataFrame]:
+    try:
+        reader = pd.read_csv(
+            stream,
+            chunksize=chunk_rows,
+            dtype={"period": str, "category": str, "amount": str},
+            keep_default_na=False,
+            encoding="utf-8",
+        )
+        # Malformed rows further down only surface when their chunk is read.
+        yield from reader
+    except pd.errors.EmptyDataError as exc:
+        raise IngestError("CSV is empty.") from exc
+    except (pd.errors.ParserError, UnicodeDecodeError) as exc:
+        raise IngestError("File is not a valid UTF-8 CSV.") from exc
+
+
+def ingest_actuals_csv(
+    db: Session,
+    company_id: int,
+    stream: BinaryIO,
+    mappings: dict[str, str],
+    chunk_rows: int = CHUNK_ROWS,
+) -> IngestResult:
+    """Parse, map and bulk-insert actuals ``chunk_rows`` at a time.
+
+    Rows are inserted with one executemany per chunk inside the caller's transaction, so an
+    IngestError part-way through leaves nothing behind once the caller rolls back.
+    """
+    return _ingest_chunks(db, company_id, _csv_chunks(stream, chunk_rows), mappings, "csv")
+
+
+def _parquet_chunks(stream: BinaryIO, chunk_rows: int) -> Iterable[pd.DataFrame]:
+    try:
+        parquet = pq.ParquetFile(stream)
+    except pa.ArrowInvalid as exc:
+        raise IngestError("File is not valid Parquet.") from exc
+    if not REQUIRED_COLUMNS.issubset(parquet.schema_arrow.names):
+        raise IngestError("Parquet must include period, category, amount")
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=sorted(REQUIRED_COLUMNS)):
+        period = batch.column("period")
+        if pa.types.is_timestamp(period.type):
+            period = pc.cast(period, pa.date32())
+        yield pd.DataFrame(
+            {
+                "period": pc.cast(period, pa.string()).to_pandas(),
+                "category": batch.column("category").to_pandas(),
+                "amount": batch.column("amount").to_pandas(),
+            }
+        )
+
+
+def ingest_actuals_parquet(
+    db: Session,
+    company_id: int,
+    stream: BinaryIO,
+    mappings: dict[str, str],
+    chunk_rows: int = CHUNK_ROWS,
+) -> IngestResult:
+    """Same as ingest_actuals_csv, reading row batches from a seekable Parquet file."""
+    return _ingest_chunks(
+        db, company_id, _parquet_chunks(stream, chunk_rows), mappings, "parquet"
+    )
+
+
+def _ingest_chunks(
+    db: Session,
+    company_id: int,
+    chunks: Iterable[pd.DataFrame],
+    mappings: dict[str, str],
+    fmt: str,
+) -> IngestResult:
+    start = time.perf_counter()
+    result = IngestResult()
+    for chunk in chunks:
+        canonical = _canonical_chunk(chunk, mappings)
+        if canonical.empty:
+            continue
+        canonical.insert(0, "company_id", company_id)
+        db.execute(insert(Actual), canonical.to_dict("records"))
+        result.rows += len(canonical)
+        result.periods.update(canonical["period"].unique().tolist())
+    INGEST_ROWS.labels(format=fmt).inc(result.rows)
+    if result.rows:
+        INGEST_THROUGHPUT.labels(format=fmt).observe(result.rows / (time.perf_counter() - start))
+    return result
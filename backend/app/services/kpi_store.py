@@ -0,0 +1,197 @@
+from datetime import date
+from typing import Iterable
+
+import pandas as pd
+from opentelemetry import trace
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.core.metrics import KPI_COMPUTE_DURATION, size_class
+from app.db.session import SessionLocal
+from app.models.entities import Actual, Company, CompanyKPI
+from app.services.finance import (
+    RUNWAY_WINDOW,
+    ActualRecord,
+    CompanyKPISnapshot,
+    KPIResult,
+    compute_kpi_frame,
+    compute_portfolio_kpi_frame,
+)
+from app.services.response_cache import bump_data_version
+
+BACKFILL_BATCH_COMPANIES = 500
+KPI_COLUMNS = [
+    "period",
+    "revenue",
+    "gross_profit",
+    "gross_margin",
+    "opex",
+    "ebitda",
+    "burn",
+    "cash_balance",
+    "runway_months",
+]
+
+tracer = trace.get_tracer(__name__)
+
+
+def _to_result(row) -> KPIResult:
+    return KPIResult(*(getattr(row, column) for column in KPI_COLUMNS))
+
+
+def refresh_company_kpis(db: Session, company_id: int, periods: Iterable[date]) -> int:
+    """Recompute stored KPIs for ``periods`` and the later periods whose runway they feed.
+
+    Pending actuals are flushed first and the caller owns the commit. Returns rows written.
+    """
+    db.flush()
+    all_periods = [
+        period
+        for (period,) in db.query(Actual.period)
+        .filter(Actual.company_id == company_id)
+        .distinct()
+        .order_by(Actual.period)
+    ]
+    position = {period: idx for idx, period in enumerate(all_periods)}
+    touched = {position[p] for p in periods if p in position}
+    if not touched:
+        return 0
+    affected = sorted(
+        {
+            min(idx + offset, len(all_periods) - 1)
+            for idx in touched
+            for offset in range(RUNWAY_WINDOW)
+        }
+    )
+    first = max(0, affected[0] - (RUNWAY_WINDOW - 1))
+    rows = (
+        db.query(Actual.period, Actual.category, Actual.amount)
+        .filter(
+            Actual.company_id == company_id,
+            Actual.period >= all_periods[first],
+            Actual.period <= all_periods[affected[-1]],
+        )
+        .all()
+    )
+    affected_periods = {all_periods[idx] for idx in affected}
+    with tracer.start_as_current_span("kpis.compute") as span, KPI_COMPUTE_DURATION.labels(
+        size=size_class(len(rows))
+    ).time():
+        kpis = [
+            k
+            for k in compute_kpi_frame(ActualRecord(*row) for row in rows).to_results()
+            if k.period in affected_periods
+        ]
+        span.set_attribute("actuals.rows", len(rows))
+        span.set_attribute("kpi.rows", len(kpis))
+    db.query(CompanyKPI).filter(
+        CompanyKPI.company_id == company_id, CompanyKPI.period.in_(affected_periods)
+    ).delete(synchronize_session=False)
+    db.add_all(CompanyKPI(company_id=company_id, **k.__dict__) for k in kpis)
+    return len(kpis)
+
+
+def rebuild_company_kpis(db: Session, company_id: int) -> int:
+    periods = [
+        p for (p,) in db.query(Actual.period).filter(Actual.company_id == company_id).distinct()
+    ]
+    return refresh_company_kpis(db, company_id, periods)
+
+
+def rebuild_portfolio_kpis(db: Session, company_ids: list[int]) -> int:
+    """Rebuild stored KPIs for ``company_ids`` from one actuals query and one vectorized pass.
+
+    The caller owns the commit. Returns rows written.
+    """
+    rows = (
+        db.query(Actual.company_id, Actual.period, Actual.category, Actual.amount)
+        .filter(Actual.company_id.in_(company_ids))
+        .all()
+    )
+    actuals = pd.DataFrame(rows, columns=["company_id", "period", "category", "amount"])
+    with tracer.start_as_current_span("kpis.compute") as span, KPI_COMPUTE_DURATION.labels(
+        size=size_class(len(rows))
+    ).time():
+        frame = compute_portfolio_kpi_frame(actuals)
+        kpis = [
+            {"company_id": company_id, **k.__dict__}
+            for company_id, k in zip(frame.company_id.tolist(), frame.to_results(), strict=True)
+        ]
+        span.set_attribute("actuals.rows", len(rows))
+        span.set_attribute("kpi.rows", len(kpis))
+    db.query(CompanyKPI).filter(CompanyKPI.company_id.in_(company_ids)).delete(
+        synchronize_session=False
+    )
+    if kpis:
+        db.execute(insert(CompanyKPI), kpis)
+    return len(kpis)
+
+
+def load_company_kpis(db: Session, company_id: int) -> list[KPIResult]:
+    rows = (
+        db.query(*(getattr(CompanyKPI, column) for column in KPI_COLUMNS))
+        .filter(CompanyKPI.company_id == company_id)
+        .order_by(CompanyKPI.period)
+        .all()
+    )
+    return [_to_result(row) for row in rows]
+
+
+def load_latest_kpis(db: Session, org_id: int) -> list[tuple[str, CompanyKPISnapshot]]:
+    """Latest and prior stored KPIs for every company in the org, in one query."""
+    rank = (
+        func.row_number()
+        .over(partition_by=CompanyKPI.company_id, order_by=CompanyKPI.period.desc())
+        .label("rank")
+    )
+    ranked = (
+        db.query(
+            CompanyKPI.company_id,
+            Company.name.label("company_name"),
+            *(getattr(CompanyKPI, column) for column in KPI_COLUMNS),
+            rank,
+        )
+        .join(Company, Company.id == CompanyKPI.company_id)
+        .filter(Company.org_id == org_id)
+        .subquery()
+    )
+    rows = (
+        db.query(ranked)
+        .filter(ranked.c.rank <= 2)
+        .order_by(ranked.c.company_id, ranked.c.rank)
+        .all()
+    )
+    snapshots: list[tuple[str, CompanyKPISnapshot]] = []
+    for row in rows:
+        if row.rank == 1:
+            snapshots.append(
+                (row.company_name, CompanyKPISnapshot(row.company_id, _to_result(row), None))
+            )
+        else:
+            name, snapshot = snapshots[-1]
+            snapshots[-1] = (
+                name,
+                CompanyKPISnapshot(snapshot.company_id, snapshot.latest, _to_result(row)),
+            )
+    return snapshots
+
+
+def backfill() -> None:
+    """Rebuild every company's stored KPIs, ``BACKFILL_BATCH_COMPANIES`` companies per query."""
+    db = SessionLocal()
+    try:
+        companies = db.query(Company.id, Company.org_id).order_by(Company.id).all()
+        for start in range(0, len(companies), BACKFILL_BATCH_COMPANIES):
+            batch = companies[start : start + BACKFILL_BATCH_COMPANIES]
+            rebuild_portfolio_kpis(db, [company_id for company_id, _org_id in batch])
+        db.commit()
+    finally:
+        db.close()
+    # Cached dashboards and KPI reads were built from the old rows; packs pick up the new KPI
+    # rows through pack_fingerprint.
+    for company_id, org_id in companies:
+        bump_data_version(org_id, company_id)
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,96 @@
+import csv
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.entities import Mapping
+from app.services.finance import CANONICAL_CATEGORIES
+
+UPSERT_BATCH_ROWS = 1_000
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class MappingImportError(ValueError):
+    pass
+
+
+@dataclass
+class MappingImportResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+def upsert_mappings(db: Session, company_id: int, mappings: dict[str, str]) -> None:
+    """Insert or update ``source_account -> canonical_category`` pairs with ON CONFLICT.
+
+    Relies on uq_mappings_company_source; the caller owns the commit.
+    """
+    insert = _INSERTS[db.get_bind().dialect.name]
+    rows = [
+        {"company_id": company_id, "source_account": source, "canonical_category": category}
+        for source, category in mappings.items()
+    ]
+    for start in range(0, len(rows), UPSERT_BATCH_ROWS):
+        stmt = insert(Mapping).values(rows[start : start + UPSERT_BATCH_ROWS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Mapping.company_id, Mapping.source_account],
+            set_={"canonical_category": stmt.excluded.canonical_category},
+        )
+        db.execute(stmt)
+
+
+def validate_mapping(source_account: str, canonical_category: str) -> str | None:
+    if not source_account:
+        return "source_account is empty"
+    if canonical_category not in CANONICAL_CATEGORIES:
+        return f"canonical_category '{canonical_category}' is not one of {CANONICAL_CATEGORIES}"
+    return None
+
+
+def import_mappings_csv(db: Session, company_id: int, stream: TextIO) -> MappingImportResult:
+    """Validate a whole mappings CSV, then write only the rows that change anything.
+
+    Existing mappings are read once and diffed in memory. If any row is invalid nothing is
+    written and every error is returned, keyed by CSV line number.
+    """
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames or not {"source_account", "canonical_category"}.issubset(
+        reader.fieldnames
+    ):
+        raise MappingImportError("CSV must include source_account and canonical_category")
+    result = MappingImportResult()
+    incoming: dict[str, tuple[int, str]] = {}
+    for line, row in enumerate(reader, start=2):
+        source = row["source_account"] or ""
+        category = row["canonical_category"] or ""
+        error = validate_mapping(source, category)
+        if error is None and source in incoming and incoming[source][1] != category:
+            error = f"source_account '{source}' already mapped on line {incoming[source][0]}"
+        if error:
+            result.errors.append({"line": line, "source_account": source, "error": error})
+        else:
+            incoming[source] = (line, category)
+    if result.errors:
+        return result
+    existing = dict(
+        db.query(Mapping.source_account, Mapping.canonical_category).filter(
+            Mapping.company_id == company_id
+        )
+    )
+    changed = {}
+    for source, (_, category) in incoming.items():
+        current = existing.get(source)
+        if current == category:
+            result.unchanged += 1
+            continue
+        if current is None:
+            result.inserted += 1
+        else:
+            result.updated += 1
+        changed[source] = category
+    upsert_mappings(db, company_id, changed)
+    return result
@@ -0,0 +1,113 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.models.entities import OrganizationSetting
+
+_SESSION_KEY = "org_settings"
+
+
+@dataclass(frozen=True)
+class OrgSettings:
+    id: int
+    org_id: int
+    runway_risk_threshold: float
+    revenue_drop_threshold: float
+    margin_drop_threshold: float
+
+    @classmethod
+    def from_row(cls, row: OrganizationSetting) -> "OrgSettings":
+        return cls(
+            row.id,
+            row.org_id,
+            row.runway_risk_threshold,
+            row.revenue_drop_threshold,
+            row.margin_drop_threshold,
+        )
+
+
+class _ProcessCache:
+    """Per-process org settings with a TTL, so writes from other workers show up eventually."""
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[OrgSettings, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, org_id: int) -> OrgSettings | None:
+        with self._lock:
+            entry = self._entries.get(org_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(org_id, None)
+                record_cache("org_settings", False)
+                return None
+            record_cache("org_settings", True)
+            return entry[0]
+
+    def put(self, value: OrgSettings) -> None:
+        with self._lock:
+            self._entries[value.org_id] = (
+                value,
+                time.monotonic() + settings.org_settings_cache_ttl_seconds,
+            )
+
+    def evict(self, org_id: int) -> None:
+        with self._lock:
+            self._entries.pop(org_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+org_settings_cache = _ProcessCache()
+
+
+def load_org_settings(db: Session, org_id: int, fresh: bool = False) -> OrgSettings:
+    """Org risk thresholds, memoized on the session and cached per process.
+
+    ``fresh`` skips the process cache (and refills it): results stored beyond this request, such
+    as the versioned dashboard response, must not be built from another worker's stale copy.
+    An org without a settings row gets one seeded from the app defaults (and committed).
+    """
+    memo = db.info.setdefault(_SESSION_KEY, {})
+    if org_id in memo:
+        return memo[org_id]
+    value = None if fresh else org_settings_cache.get(org_id)
+    if value is None:
+        row = db.query(OrganizationSetting).filter(OrganizationSetting.org_id == org_id).first()
+        if row is None:
+            row = OrganizationSetting(
+                org_id=org_id,
+                runway_risk_threshold=settings.runway_risk_threshold,
+                revenue_drop_threshold=settings.revenue_drop_threshold,
+                margin_drop_threshold=settings.margin_drop_threshold,
+            )
+            db.add(row)
+            db.commit()
+            db.refresh(row)
+        value = OrgSettings.from_row(row)
+        org_settings_cache.put(value)
+    memo[org_id] = value
+    return value
+
+
+def save_org_settings(db: Session, org_id: int, values: dict[str, float]) -> OrgSettings:
+    """Write the thresholds, commit, and drop every cached copy for ``org_id``."""
+    row = db.query(OrganizationSetting).filter(OrganizationSetting.org_id == org_id).first()
+    if row is None:
+        row = OrganizationSetting(org_id=org_id)
+        db.add(row)
+    for name, value in values.items():
+        setattr(row, name, value)
+    row.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(row)
+    org_settings_cache.evict(org_id)
+    value = OrgSettings.from_row(row)
+    db.info.setdefault(_SESSION_KEY, {})[org_id] = value
+    return value
@@ -0,0 +1,380 @@
+import atexit
+import hashlib
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Iterator
+
+from opentelemetry import trace
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.metrics import (
+    FORECAST_DURATION,
+    PACK_BUILD_DURATION,
+    PACK_SIZE,
+    record_cache,
+    size_class,
+)
+from app.excel.exporter import spool_workbook
+from app.models.entities import Actual, Company, CompanyKPI, Mapping, Scenario
+from app.services.finance import (
+    CANONICAL_CATEGORIES,
+    Distribution,
+    KPIResult,
+    forecast,
+    sensitivity_grid,
+    simulate_forecast,
+)
+from app.services.kpi_store import load_company_kpis
+
+tracer = trace.get_tracer(__name__)
+
+
+def unmapped_accounts(db: Session, company_id: int) -> list[str]:
+    with tracer.start_as_current_span("pack.mapping_check") as span:
+        mappings = {
+            source
+            for (source,) in db.query(Mapping.source_account).filter(
+                Mapping.company_id == company_id
+            )
+        }
+        categories = db.query(Actual.category).filter(Actual.company_id == company_id).distinct()
+        unmapped = [
+            source
+            for (source,) in categories
+            if source not in CANONICAL_CATEGORIES and source not in mappings
+        ]
+        span.set_attribute("mapping.rows", len(mappings))
+        span.set_attribute("mapping.unmapped", len(unmapped))
+        return unmapped
+
+
+def pack_fingerprint(db: Session, company_id: int, simulate: bool = False) -> str:
+    """Hash of everything a pack is built from, including whether it carries a simulation sheet.
+
+    Actuals are append-only, so their count, max id and total identify the set without
+    reading every row. Stored KPIs are rewritten as new rows, so their count and max id change
+    whenever they are recomputed. Mappings and scenarios are small and hashed in full.
+    """
+    with tracer.start_as_current_span("pack.fingerprint") as span:
+        digest = hashlib.sha256(b"simulate" if simulate else b"")
+        company = db.query(Company.name).filter(Company.id == company_id).first()
+        digest.update(repr(company).encode())
+        actuals = (
+            db.query(func.count(Actual.id), func.max(Actual.id), func.sum(Actual.amount))
+            .filter(Actual.company_id == company_id)
+            .one()
+        )
+        digest.update(repr(tuple(actuals)).encode())
+        kpis = (
+            db.query(func.count(CompanyKPI.id), func.max(CompanyKPI.id))
+            .filter(CompanyKPI.company_id == company_id)
+            .one()
+        )
+        digest.update(repr(tuple(kpis)).encode())
+        mappings = (
+            db.query(Mapping.source_account, Mapping.canonical_category)
+            .filter(Mapping.company_id == company_id)
+            .order_by(Mapping.source_account)
+            .all()
+        )
+        digest.update(repr([tuple(m) for m in mappings]).encode())
+        scenarios = (
+            db.query(
+                Scenario.id,
+                Scenario.name,
+                Scenario.revenue_growth,
+                Scenario.gross_margin,
+                Scenario.opex_growth,
+            )
+            .filter(Scenario.company_id == company_id)
+            .order_by(Scenario.id)
+            .all()
+        )
+        digest.update(repr([tuple(s) for s in scenarios]).encode())
+        span.set_attribute("actuals.rows", actuals[0])
+        return digest.hexdigest()
+
+
+def _pack_key(company_id: int, fingerprint: str) -> str:
+    return f"pack:{company_id}:{fingerprint}"
+
+
+def get_cached_pack(company_id: int, fingerprint: str) -> bytes | None:
+    data = get_cache().get(_pack_key(company_id, fingerprint))
+    record_cache("pack", data is not None)
+    return data
+
+
+def pack_is_cached(company_id: int, fingerprint: str) -> bool:
+    cached = bool(get_cache().exists(_pack_key(company_id, fingerprint)))
+    record_cache("pack", cached)
+    return cached
+
+
+def cache_pack(company_id: int, fingerprint: str, data: bytes) -> bool:
+    """Store a rendered pack unless it is over ``PACK_CACHE_MAX_BYTES``; return whether it was."""
+    if len(data) > settings.pack_cache_max_bytes:
+        return False
+    get_cache().set(_pack_key(company_id, fingerprint), data, ex=settings.pack_cache_ttl_seconds)
+    return True
+
+
+SIMULATION_PATHS = 10_000
+SIMULATION_SPREADS = {"revenue_growth": 0.02, "gross_margin": 0.05, "opex_growth": 0.01}
+SCENARIO_DEFAULTS = {
+    "Base": {"revenue_growth": 0.05, "gross_margin": 0.6, "opex_growth": 0.03},
+    "Upside": {"revenue_growth": 0.1, "gross_margin": 0.65, "opex_growth": 0.04},
+    "Downside": {"revenue_growth": -0.02, "gross_margin": 0.5, "opex_growth": 0.02},
+}
+
+
+@dataclass(frozen=True)
+class PackInputs:
+    """Everything render_pack needs, loaded up front so rendering can run in another process."""
+
+    company_id: int
+    company_name: str
+    kpis: list[KPIResult]
+    scenarios: dict[str, dict[str, float]]
+    simulate: bool = False
+
+
+def load_pack_inputs(db: Session, company_id: int, simulate: bool = False) -> PackInputs:
+    with tracer.start_as_current_span("pack.load_kpis") as span:
+        kpis = load_company_kpis(db, company_id)
+        span.set_attribute("kpi.rows", len(kpis))
+    scenario_rows = db.query(Scenario).filter(Scenario.company_id == company_id).all()
+    scenario_map = {s.name: s for s in scenario_rows}
+    scenarios = {}
+    for name, defaults in SCENARIO_DEFAULTS.items():
+        scenario = scenario_map.get(name)
+        if scenario:
+            scenarios[name] = {driver: getattr(scenario, driver) for driver in defaults}
+        else:
+            scenarios[name] = dict(defaults)
+    company = db.query(Company).get(company_id)
+    return PackInputs(company_id, company.name if company else "Company", kpis, scenarios, simulate)
+
+
+def render_pack_file(inputs: PackInputs) -> SpooledTemporaryFile:
+    """Render the pack in constant-memory mode; the caller reads and closes the spooled file."""
+    start = time.perf_counter()
+    kpis = inputs.kpis
+    base_params = inputs.scenarios["Base"]
+    forecasted = _traced_forecast(kpis, "Base", base_params)
+    with tracer.start_as_current_span("pack.sensitivity_grid") as span:
+        sensitivity = sensitivity_grid(
+            kpis,
+            revenue_growth_range=[-0.05, 0.0, 0.05],
+            gross_margin_range=[0.4, 0.5, 0.6],
+            opex_growth=base_params["opex_growth"],
+        )
+        span.set_attribute("kpi.rows", len(kpis))
+        span.set_attribute("sensitivity.cells", len(sensitivity))
+    scenarios = []
+    scenario_results = []
+    scenario_deltas = []
+    for name, params in inputs.scenarios.items():
+        scenario_forecast = _traced_forecast(kpis, name, params)
+        latest_forecast = scenario_forecast[-1] if scenario_forecast else None
+        scenarios.append({"name": name, **params})
+        scenario_results.append(
+            {
+                "name": name,
+                "ending_revenue": latest_forecast.revenue if latest_forecast else 0.0,
+                "ending_ebitda": latest_forecast.ebitda if latest_forecast else 0.0,
+                "ending_runway_months": latest_forecast.runway_months if latest_forecast else 0.0,
+            }
+        )
+    base_result = next((r for r in scenario_results if r["name"] == "Base"), None)
+    for result in scenario_results:
+        if base_result and result["name"] != "Base":
+            scenario_deltas.append(
+                {
+                    "name": result["name"],
+                    "delta_revenue": result["ending_revenue"] - base_result["ending_revenue"],
+                    "delta_ebitda": result["ending_ebitda"] - base_result["ending_ebitda"],
+                    "delta_runway_months": result["ending_runway_months"]
+                    - base_result["ending_runway_months"],
+                }
+            )
+    simulation = None
+    if inputs.simulate:
+        with tracer.start_as_current_span("pack.simulation") as span:
+            simulation = _simulate_base(kpis, base_params, seed=inputs.company_id) if kpis else []
+            span.set_attribute("simulation.paths", SIMULATION_PATHS if kpis else 0)
+    with tracer.start_as_current_span("pack.build_workbook") as span:
+        output = spool_workbook(
+            inputs.company_name,
+            kpis,
+            forecasted,
+            scenarios,
+            scenario_results,
+            scenario_deltas,
+            sensitivity,
+            simulation,
+        )
+        size = output.seek(0, 2)
+        output.seek(0)
+        span.set_attribute("kpi.rows", len(kpis))
+        span.set_attribute("workbook.bytes", size)
+    PACK_BUILD_DURATION.observe(time.perf_counter() - start)
+    PACK_SIZE.observe(size)
+    return output
+
+
+def _traced_forecast(
+    kpis: list[KPIResult], scenario: str, params: dict[str, float]
+) -> list[KPIResult]:
+    with tracer.start_as_current_span("pack.forecast") as span, FORECAST_DURATION.labels(
+        size=size_class(12)
+    ).time():
+        result = forecast(
+            kpis, 12, params["revenue_growth"], params["gross_margin"], params["opex_growth"]
+        )
+        span.set_attribute("forecast.scenario", scenario)
+        span.set_attribute("kpi.rows", len(kpis))
+        span.set_attribute("forecast.rows", len(result))
+        return result
+
+
+def _simulate_base(kpis: list[KPIResult], base_params: dict[str, float], seed: int) -> list[dict]:
+    """Monte Carlo sheet rows: normal draws centred on the Base scenario drivers."""
+    drivers = {
+        driver: Distribution("normal", (base_params[driver], spread))
+        for driver, spread in SIMULATION_SPREADS.items()
+    }
+    result = simulate_forecast(kpis[-1], 12, **drivers, paths=SIMULATION_PATHS, seed=seed)
+    return result.to_rows()
+
+
+def render_pack(inputs: PackInputs) -> bytes:
+    with render_pack_file(inputs) as pack_file:
+        return pack_file.read()
+
+
+def build_company_pack(db: Session, company_id: int, simulate: bool = False) -> bytes:
+    return render_pack(load_pack_inputs(db, company_id, simulate))
+
+
+class _ZipChunks:
+    """Write-only sink for ZipFile; ``take`` hands back whatever has been written since."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PackPool:
+    """Process pool shared by every portfolio export in this process, created once.
+
+    Workers start from a forkserver rather than a fork() of the API process, whose logging,
+    audit and threadpool threads could be holding a lock at the moment of the fork. Long-lived
+    workers also leave one set of Prometheus multiprocess files each instead of one per request.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            return self._pool
+
+    def discard(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next export starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+pack_pool = PackPool(settings.pack_export_workers)
+atexit.register(pack_pool.shutdown)
+
+
+def _rendered_packs(
+    pending: list[tuple[PackInputs, str]], workers: int
+) -> Iterator[tuple[int, bytes]]:
+    """Render packs on the shared pool, keeping at most ``workers`` of this export in flight."""
+    pool = pack_pool.get()
+    running: dict[Future, tuple[int, str]] = {}
+    queue = iter(pending)
+    try:
+        while True:
+            for inputs, fingerprint in queue:
+                running[pool.submit(render_pack, inputs)] = (inputs.company_id, fingerprint)
+                if len(running) >= workers:
+                    break
+            if not running:
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                company_id, fingerprint = running.pop(future)
+                data = future.result()
+                cache_pack(company_id, fingerprint, data)
+                yield company_id, data
+    except BrokenProcessPool:
+        pack_pool.discard(pool)
+        raise
+    finally:
+        # A client that disconnects mid-download shouldn't leave its queued renders behind.
+        for future in running:
+            future.cancel()
+
+
+def stream_portfolio_zip(
+    packs: list[tuple[PackInputs, str]], workers: int, skipped: list[str]
+) -> Iterator[bytes]:
+    """Yield a ZIP of company packs as each workbook finishes.
+
+    ``packs`` pairs each company's inputs with its fingerprint. Cached packs are written first;
+    the rest are rendered across ``workers`` processes.
+    """
+    sink = _ZipChunks()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        pending = []
+        for inputs, fingerprint in packs:
+            data = get_cached_pack(inputs.company_id, fingerprint)
+            if data is None:
+                pending.append((inputs, fingerprint))
+                continue
+            archive.writestr(f"company_{inputs.company_id}_pack.xlsx", data)
+            yield sink.take()
+        for company_id, data in _rendered_packs(pending, workers):
+            archive.writestr(f"company_{company_id}_pack.xlsx", data)
+            yield sink.take()
+        if skipped:
+            archive.writestr("skipped.txt", "Unmapped accounts present:\n" + "\n".join(skipped))
+    yield sink.take()
@@ -0,0 +1,73 @@
+import time
+from dataclasses import dataclass
+
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.metrics import record_cache
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    key: str
+    etag: str
+    body: bytes | None = None
+    not_modified: bool = False
+
+
+def _version_key(org_id: int, company_id: int | None) -> str:
+    if company_id is None:
+        return f"data-version:org:{org_id}"
+    return f"data-version:company:{company_id}"
+
+
+def _data_version(key: str) -> str:
+    """Current version token for ``key``, seeding one if the cache has lost it.
+
+    Tokens are nanosecond timestamps rather than counters so a flushed cache can never hand
+    out a version (and therefore an ETag) that a client already holds for older data.
+    """
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.set(key, time.time_ns(), nx=True)
+        version = cache.get(key)
+    return version.decode()
+
+
+def bump_data_version(org_id: int, company_id: int | None = None) -> None:
+    """Invalidate cached reads for the org, and for ``company_id`` when given.
+
+    Call after the write has committed so a reader can't cache pre-commit data under the
+    new version.
+    """
+    cache = get_cache()
+    if company_id is not None:
+        cache.set(_version_key(org_id, company_id), time.time_ns())
+    cache.set(_version_key(org_id, None), time.time_ns())
+
+
+def _matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def lookup_response(
+    name: str, org_id: int, company_id: int | None = None, if_none_match: str | None = None
+) -> CachedResponse:
+    """Resolve the ETag for a cached read and, unless the client already has it, its body."""
+    version = _data_version(_version_key(org_id, company_id))
+    scope = f"{org_id}" if company_id is None else f"{org_id}:{company_id}"
+    etag = f'"{name}-{scope}-{version}"'
+    key = f"response:{name}:{scope}:{version}"
+    if _matches(etag, if_none_match):
+        record_cache(f"response:{name}", True)
+        return CachedResponse(key, etag, not_modified=True)
+    body = get_cache().get(key)
+    record_cache(f"response:{name}", body is not None)
+    return CachedResponse(key, etag, body)
+
+
+def store_response(entry: CachedResponse, body: bytes) -> None:
+    get_cache().set(entry.key, body, ex=settings.response_cache_ttl_seconds)
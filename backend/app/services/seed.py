@@ -3,6 +3,7 @@ from datetime import date
 from app.auth.security import hash_password
 from app.db.session import SessionLocal
 from app.models.entities import Actual, Company, Organization, Scenario, User
+from app.services.kpi_store import rebuild_company_kpis
 
 
 def run():
@@ -63,6 +64,7 @@ def run():
                     amount=50000 - month * 2000,
                 )
             )
+        rebuild_company_kpis(db, company.id)
     db.commit()
     db.close()
 
@@ -0,0 +1,80 @@
+"""Per-request audit write latency: commit-per-log vs enlisted vs queued writer.
+
+Uses a file-backed SQLite database so every commit pays for a journal sync.
+Run from ``backend/``: ``python -m benchmarks.bench_audit``
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import AuditLog, Company, Organization
+from app.services.audit import AuditWriter, record_audit
+
+REQUESTS = 2000
+
+
+def _session(path: Path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    org = Organization(name="Bench")
+    db.add(org)
+    db.commit()
+    return db, org.id
+
+
+def _commit_per_log(db, org_id: int, idx: int) -> None:
+    db.add(Company(org_id=org_id, name=f"Co {idx}"))
+    db.commit()
+    db.add(AuditLog(org_id=org_id, user_id=None, action="company_created", detail=str(idx)))
+    db.commit()
+
+
+def _enlisted(db, org_id: int, idx: int) -> None:
+    db.add(Company(org_id=org_id, name=f"Co {idx}"))
+    record_audit(db, org_id, None, "company_created", str(idx))
+    db.commit()
+
+
+def _time(path: Path, request) -> float:
+    db, org_id = _session(path)
+    start = time.perf_counter()
+    for idx in range(REQUESTS):
+        request(db, org_id, idx)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed / REQUESTS * 1e6
+
+
+def _time_queued(path: Path) -> tuple[float, float]:
+    db, org_id = _session(path)
+    writer = AuditWriter(max_queue=10_000, batch_rows=500, flush_interval=0.2)
+    start = time.perf_counter()
+    for idx in range(REQUESTS):
+        writer.submit(db, org_id, None, "pack_generated", str(idx))
+    submitted = time.perf_counter() - start
+    writer.stop()
+    drained = time.perf_counter() - start
+    db.close()
+    return submitted / REQUESTS * 1e6, drained / REQUESTS * 1e6
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        legacy = _time(root / "legacy.db", _commit_per_log)
+        enlisted = _time(root / "enlisted.db", _enlisted)
+        submit, drained = _time_queued(root / "queued.db")
+    print(f"{'path':<28} {'us/request':>11}")
+    print(f"{'write + commit per log':<28} {legacy:>11.1f}")
+    print(f"{'enlisted in write txn':<28} {enlisted:>11.1f}")
+    print(f"{'queued submit (read route)':<28} {submit:>11.1f}")
+    print(f"{'queued incl. drain':<28} {drained:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
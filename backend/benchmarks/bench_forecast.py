@@ -0,0 +1,52 @@
+"""Sensitivity grid throughput: per-cell forecast loop vs the batched forecast engine.
+
+Run from ``backend/``: ``python -m benchmarks.bench_forecast``
+"""
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.services.finance import KPIResult, sensitivity_grid
+
+GRID_SIZES = [3, 25, 50]
+MONTHS = 36
+BASE = [KPIResult(date(2024, 6, 1), 120_000, 72_000, 0.6, 90_000, -18_000, 18_000, 2_000_000, 111)]
+
+
+def _loop_grid(base_kpis, revenue_growth_range, gross_margin_range, opex_growth, months):
+    grid = []
+    last = base_kpis[-1]
+    for rg in revenue_growth_range:
+        for gm in gross_margin_range:
+            period, revenue, opex = last.period, last.revenue, last.opex
+            cash, runway = last.cash_balance, 0.0
+            for _ in range(months):
+                period = (period.replace(day=1) + pd.DateOffset(months=1)).date()
+                revenue *= 1 + rg
+                opex *= 1 + opex_growth
+                burn = max(0.0, -(revenue * gm - opex))
+                cash = max(0.0, cash - burn)
+                runway = cash / max(1.0, burn)
+            grid.append({"revenue_growth": rg, "gross_margin": gm, "runway_months": runway})
+    return grid
+
+
+def main() -> None:
+    print(f"{'grid':>7} {'months':>7} {'loop (s)':>9} {'batched (s)':>12}")
+    for size in GRID_SIZES:
+        growth = np.linspace(-0.05, 0.1, size).tolist()
+        margin = np.linspace(0.3, 0.8, size).tolist()
+        start = time.perf_counter()
+        expected = _loop_grid(BASE, growth, margin, 0.03, MONTHS)
+        loop_s = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = sensitivity_grid(BASE, growth, margin, 0.03, MONTHS)
+        batched_s = time.perf_counter() - start
+        assert actual == expected
+        print(f"{f'{size}x{size}':>7} {MONTHS:>7} {loop_s:>9.3f} {batched_s:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
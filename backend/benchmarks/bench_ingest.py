@@ -0,0 +1,88 @@
+"""Actuals CSV ingestion throughput (rows/sec) against in-memory SQLite.
+
+Run from ``backend/``: ``python -m benchmarks.bench_ingest``
+"""
+import random
+import time
+from datetime import date
+from io import BytesIO, StringIO
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import Actual, Company, Organization
+from app.services.finance import CANONICAL_CATEGORIES
+from app.services.ingest import ingest_actuals_csv
+
+ROW_COUNTS = [10_000, 100_000]
+MAPPINGS = {f"{4000 + idx} GL": category for idx, category in enumerate(CANONICAL_CATEGORIES)}
+
+
+def _csv(rows: int) -> bytes:
+    rng = random.Random(7)
+    accounts = list(MAPPINGS) + CANONICAL_CATEGORIES
+    lines = ["period,category,amount"]
+    for idx in range(rows):
+        month = idx % 120
+        period = date(2015 + month // 12, month % 12 + 1, 1)
+        lines.append(f"{period.isoformat()},{rng.choice(accounts)},{rng.uniform(1, 50_000):.2f}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _session():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    org = Organization(name="Bench")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Bench Co")
+    db.add(company)
+    db.commit()
+    return db, company.id
+
+
+def _legacy_ingest(db, company_id: int, data: bytes) -> None:
+    df = pd.read_csv(StringIO(data.decode("utf-8")))
+    for _, row in df.iterrows():
+        category = str(row["category"])
+        if category not in CANONICAL_CATEGORIES:
+            category = MAPPINGS[category]
+        db.add(
+            Actual(
+                company_id=company_id,
+                period=date.fromisoformat(str(row["period"])),
+                category=category,
+                amount=float(row["amount"]),
+            )
+        )
+    db.commit()
+
+
+def _streaming_ingest(db, company_id: int, data: bytes) -> None:
+    ingest_actuals_csv(db, company_id, BytesIO(data), MAPPINGS)
+    db.commit()
+
+
+def _rows_per_sec(ingest, data: bytes, rows: int) -> float:
+    db, company_id = _session()
+    start = time.perf_counter()
+    ingest(db, company_id, data)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return rows / elapsed
+
+
+def main() -> None:
+    print(f"{'rows':>8} {'legacy rows/s':>14} {'streaming rows/s':>17}")
+    for rows in ROW_COUNTS:
+        data = _csv(rows)
+        legacy = _rows_per_sec(_legacy_ingest, data, rows)
+        streaming = _rows_per_sec(_streaming_ingest, data, rows)
+        print(f"{rows:>8} {legacy:>14,.0f} {streaming:>17,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""KPI engine scaling benchmark.
+
+Run from ``backend/``: ``python -m benchmarks.bench_kpis``
+"""
+import random
+import time
+from datetime import date
+
+import pandas as pd
+
+from app.services.finance import (
+    CANONICAL_CATEGORIES,
+    ActualRecord,
+    compute_kpi_frame,
+    compute_kpis,
+    compute_portfolio_kpis,
+)
+
+COMPANIES = 1000
+PERIOD_COUNTS = [12, 24, 60, 120]
+
+
+def _company_actuals(periods: int, rng: random.Random) -> list[ActualRecord]:
+    records = []
+    for month in range(periods):
+        period = date(2015 + month // 12, month % 12 + 1, 1)
+        for category in CANONICAL_CATEGORIES:
+            records.append(ActualRecord(period, category, rng.uniform(1_000, 50_000)))
+    return records
+
+
+def _time(fn, portfolio) -> float:
+    start = time.perf_counter()
+    for actuals in portfolio:
+        fn(actuals)
+    return time.perf_counter() - start
+
+
+def _portfolio_frame(portfolio) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            (company_id, a.period, a.category, a.amount)
+            for company_id, actuals in enumerate(portfolio)
+            for a in actuals
+        ],
+        columns=["company_id", "period", "category", "amount"],
+    )
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(
+        f"{'periods':>8} {'companies':>10} {'frame (s)':>10} {'results (s)':>12} {'batch (s)':>10}"
+    )
+    for periods in PERIOD_COUNTS:
+        portfolio = [_company_actuals(periods, rng) for _ in range(COMPANIES)]
+        frame_s = _time(compute_kpi_frame, portfolio)
+        results_s = _time(compute_kpis, portfolio)
+        batch_s = _time(compute_portfolio_kpis, [_portfolio_frame(portfolio)])
+        print(f"{periods:>8} {COMPANIES:>10} {frame_s:>10.3f} {results_s:>12.3f} {batch_s:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
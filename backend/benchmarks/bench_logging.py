@@ -0,0 +1,79 @@
+"""Log calls per second under thread contention: inline json handler vs the queued pipeline.
+
+Output goes to /dev/null so the numbers reflect the cost paid by the logging thread.
+Run from ``backend/``: ``python -m benchmarks.bench_logging``
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from app.core import logging as app_logging
+from app.core.request_id import get_request_id, request_id_ctx
+
+THREADS = [1, 8, 32]
+CALLS_PER_THREAD = 5_000
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "timestamp": datetime.utcnow().isoformat(),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "request_id": get_request_id() or None,
+            }
+        )
+
+
+def _legacy(sink) -> None:
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(LegacyJsonFormatter())
+    logging.getLogger().handlers = [handler]
+
+
+def _pipeline(sink, sample_rate: float) -> None:
+    app_logging.settings.log_queue = True
+    app_logging.settings.log_info_sample_rate = sample_rate
+    app_logging.setup_logging(sink)
+
+
+def _calls_per_sec(threads: int) -> float:
+    logger = logging.getLogger("bench")
+
+    def work(idx: int) -> None:
+        for call in range(CALLS_PER_THREAD):
+            request_id_ctx.set(f"req-{idx}-{call // 10}")
+            logger.info("rendered %s for company %d", "dashboard", call)
+
+    workers = [threading.Thread(target=work, args=(idx,)) for idx in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * CALLS_PER_THREAD / (time.perf_counter() - start)
+
+
+def main() -> None:
+    logging.getLogger().setLevel(logging.INFO)
+    with open(os.devnull, "w") as sink:
+        print(f"{'threads':>8} {'inline/s':>10} {'queued/s':>10} {'queued 10%/s':>13}")
+        for threads in THREADS:
+            _legacy(sink)
+            inline = _calls_per_sec(threads)
+            _pipeline(sink, 1.0)
+            queued = _calls_per_sec(threads)
+            app_logging.stop_logging()
+            _pipeline(sink, 0.1)
+            sampled = _calls_per_sec(threads)
+            app_logging.stop_logging()
+            print(f"{threads:>8} {inline:>10,.0f} {queued:>10,.0f} {sampled:>13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
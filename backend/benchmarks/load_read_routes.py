@@ -0,0 +1,86 @@
+"""Concurrent load against the read-heavy routes of a running API.
+
+Run it against a server built before the async port and one built after, with the same
+database and worker count. Given two base URLs it loads each in turn and prints them side by
+side with the after/before throughput ratio.
+
+Run from ``backend/``:
+``python -m benchmarks.load_read_routes <base-url> <access-token> <company-id> [<after-url>]``
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+CONCURRENCY = [1, 16, 64]
+REQUESTS = 500
+WARMUP_REQUESTS = 50
+
+
+async def _run(
+    client: httpx.AsyncClient, path: str, concurrency: int, requests: int
+) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+
+    async def _worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def _measure(
+    base_url: str, token: str, paths: list[str]
+) -> dict[tuple[str, int], tuple[float, float, float]]:
+    """(path, concurrency) -> (requests/s, p50 ms, p95 ms) for one server."""
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=max(CONCURRENCY))
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits) as client:
+        for path in paths:
+            # Fill the server's connection pools and caches before timing anything.
+            await _run(client, path, max(CONCURRENCY), WARMUP_REQUESTS)
+            for concurrency in CONCURRENCY:
+                start = time.perf_counter()
+                latencies = await _run(client, path, concurrency, REQUESTS)
+                elapsed = time.perf_counter() - start
+                results[path, concurrency] = (
+                    len(latencies) / elapsed,
+                    statistics.median(latencies) * 1000,
+                    statistics.quantiles(latencies, n=20)[-1] * 1000,
+                )
+    return results
+
+
+async def main(base_url: str, token: str, company_id: str, after_url: str | None = None) -> None:
+    paths = [
+        "/portfolio/dashboard",
+        "/companies",
+        "/audit/logs",
+        f"/companies/{company_id}/mappings/status",
+    ]
+    runs = [await _measure(url, token, paths) for url in filter(None, [base_url, after_url])]
+    header = f"{'route':<34} {'conc':>5}"
+    for label in ["before ", "after "] if after_url else [""]:
+        header += f" {label + 'req/s':>13} {label + 'p50':>10} {label + 'p95':>10}"
+    print(header + (f" {'ratio':>6}" if after_url else "") + "   (latencies in ms)")
+    for path in paths:
+        for concurrency in CONCURRENCY:
+            line = f"{path:<34} {concurrency:>5}"
+            for run in runs:
+                rps, p50, p95 = run[path, concurrency]
+                line += f" {rps:>13.0f} {p50:>10.1f} {p95:>10.1f}"
+            if after_url:
+                line += f" {runs[1][path, concurrency][0] / runs[0][path, concurrency][0]:>6.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*sys.argv[1:5]))
@@ -1,5 +1,12 @@
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
+
+os.environ.setdefault("CACHE_URL", "memory://")
+os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "true")
+os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp(prefix="prs-blobs-"))
+os.environ.setdefault("AUDIT_QUEUE_SIZE", "0")
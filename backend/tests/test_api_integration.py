@@ -1,22 +1,34 @@
 from io import BytesIO
+from uuid import uuid4
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.db.session import Base, get_db
+from app.auth.principals import principal_cache
+from app.core.cache import get_cache
+from app.db.session import Base, get_async_db, get_db
+from app.services.org_settings import org_settings_cache
 from app.models import entities  # noqa: F401
 from app.models.entities import User
 from app.main import app
 
 
 def _client():
+    # A named shared-cache memory database, so the aiosqlite engine behind the async routes
+    # sees what the sync routes write. The StaticPool connection keeps it alive.
+    database = f"file:{uuid4().hex}?mode=memory&cache=shared&uri=true"
     engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
+        f"sqlite+pysqlite:///{database}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    AsyncTestingSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
 
@@ -27,7 +39,15 @@ def _client():
         finally:
             db.close()
 
+    async def _get_async_db_override():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = _get_db_override
+    app.dependency_overrides[get_async_db] = _get_async_db_override
+    get_cache().flushdb()
+    principal_cache.clear()
+    org_settings_cache.clear()
     return TestClient(app), TestingSessionLocal
 
 
@@ -71,7 +91,7 @@ def test_auth_upload_and_pack_download():
         f"/companies/{company_id}/mappings/status", headers={"Authorization": f"Bearer {token}"}
     )
     assert mapping_status.status_code == 200
-    assert mapping_status.json()["unmapped_accounts"] == []
+    assert mapping_status.json()["items"] == []
 
     export = client.get(
         f"/companies/{company_id}/mappings/export", headers={"Authorization": f"Bearer {token}"}
@@ -122,3 +142,62 @@ def test_viewer_cannot_create_company():
     )
     assert response.status_code == 403
 
+
+def test_portfolio_dashboard_summarizes_every_company():
+    client, _ = _client()
+    client.post(
+        "/auth/register",
+        params={"org_name": "Dash Org", "email": "dash@example.com", "password": "pass"},
+    )
+    login = client.post("/auth/login", params={"email": "dash@example.com", "password": "pass"})
+    token = login.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    uploads = {
+        "Steady": (
+            "period,category,amount\n"
+            "2024-01-01,Revenue,1000\n2024-02-01,Revenue,1100\n2024-02-01,Cash,50000\n"
+        ),
+        "Sliding": (
+            "period,category,amount\n"
+            "2024-01-01,Revenue,1000\n2024-02-01,Revenue,500\n"
+            "2024-02-01,G&A,900\n2024-02-01,Cash,1000\n"
+        ),
+    }
+    for name, csv_data in uploads.items():
+        company_id = client.post("/companies", headers=headers, json={"name": name}).json()["id"]
+        files = {"file": ("actuals.csv", BytesIO(csv_data.encode("utf-8")), "text/csv")}
+        upload = client.post(f"/companies/{company_id}/actuals", headers=headers, files=files)
+        assert upload.status_code == 200
+    client.post("/companies", headers=headers, json={"name": "Empty"})
+
+    dashboard = client.get("/portfolio/dashboard", headers=headers)
+    assert dashboard.status_code == 200
+    summary = {row["company"]: row for row in dashboard.json()["summary"]}
+    assert set(summary) == {"Steady", "Sliding"}
+    assert summary["Steady"]["revenue_change"] == 0.1
+    assert summary["Sliding"]["revenue_change"] == -0.5
+    assert summary["Sliding"]["runway_months"] == 1000 / 200
+    assert [row["company"] for row in dashboard.json()["risks"]] == ["Sliding"]
+
+
+def test_async_read_routes_see_sync_writes():
+    client, _ = _client()
+    client.post(
+        "/auth/register",
+        params={"org_name": "Async Org", "email": "async@example.com", "password": "pass"},
+    )
+    login = client.post("/auth/login", params={"email": "async@example.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    company_id = client.post("/companies", headers=headers, json={"name": "Acme"}).json()["id"]
+    client.post(
+        f"/companies/{company_id}/mappings",
+        headers=headers,
+        params={"source_account": "4000", "canonical_category": "Revenue"},
+    )
+
+    companies = client.get("/companies", headers=headers)
+    assert [company["name"] for company in companies.json()["items"]] == ["Acme"]
+    status = client.get(f"/companies/{company_id}/mappings/status", headers=headers)
+    assert status.json() == {"items": [], "next_cursor": None, "mapped_count": 1}
+    logs = client.get("/audit/logs", headers=headers, params={"action": "company_created"})
+    assert [log["detail"] for log in logs.json()["items"]] == ["Acme"]
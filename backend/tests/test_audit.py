@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import AuditLog, Organization
+from app.services.audit import AuditWriter, record_audit
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    org = Organization(name="Audit Org")
+    db.add(org)
+    db.commit()
+    return db, org.id
+
+
+def _count(db) -> int:
+    return db.scalar(select(func.count()).select_from(AuditLog))
+
+
+def test_enlisted_audit_row_commits_and_rolls_back_with_the_caller(tmp_path):
+    db, org_id = _session(tmp_path)
+    record_audit(db, org_id, None, "company_created", "Acme")
+    db.rollback()
+    assert _count(db) == 0
+    record_audit(db, org_id, None, "company_created", "Acme")
+    db.commit()
+    assert _count(db) == 1
+
+
+def test_writer_batches_queued_rows_and_flushes_on_stop(tmp_path):
+    db, org_id = _session(tmp_path)
+    writer = AuditWriter(max_queue=8, batch_rows=5, flush_interval=0.05)
+    for idx in range(12):
+        writer.submit(db, org_id, None, "pack_generated", str(idx))
+    writer.flush()
+    assert _count(db) == 12
+    writer.submit(db, org_id, None, "pack_generated", "last")
+    writer.stop()
+    db.expire_all()
+    assert _count(db) == 13
+    details = db.scalars(select(AuditLog.detail).order_by(AuditLog.id)).all()
+    assert details == [str(idx) for idx in range(12)] + ["last"]
+
+
+def test_writer_without_queue_commits_on_the_request_session(tmp_path):
+    db, org_id = _session(tmp_path)
+    AuditWriter(max_queue=0, batch_rows=5, flush_interval=0.05).submit(
+        db, org_id, None, "pack_job_submitted", "1"
+    )
+    assert _count(sessionmaker(bind=db.get_bind())()) == 1
@@ -0,0 +1,58 @@
+import gzip
+from io import BytesIO
+
+from app.api import routes
+from app.models.entities import Actual, AuditLog, Upload
+from app.services.blobs import LocalBlobStore, get_blob_store, sha256_stream
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+
+def test_local_store_keeps_one_compressed_copy_per_hash(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    body = BytesIO(b"period,category,amount\n" * 1000)
+    digest, size = sha256_stream(body)
+    store.put(digest, body)
+    store.put(digest, body)
+    stored = list(tmp_path.rglob("*.gz"))
+    assert len(stored) == 1
+    assert stored[0].stat().st_size < size
+    assert gzip.decompress(stored[0].read_bytes()) == body.getvalue()
+    with store.open(digest) as blob:
+        assert blob.read() == body.getvalue()
+    assert body.tell() == 0
+
+
+def test_identical_reupload_is_skipped_before_parsing(monkeypatch):
+    client, session_factory = _client()
+    headers, company_id = _setup(client)
+    csv_data = b"period,category,amount\n2024-02-01,Revenue,1500\n2024-02-01,Cash,4000\n"
+
+    def _upload():
+        files = {"file": ("feb.csv", BytesIO(csv_data), "text/csv")}
+        return client.post(f"/companies/{company_id}/actuals", headers=headers, files=files)
+
+    first = _upload().json()
+    assert first["status"] == "ok"
+    parsed = []
+    monkeypatch.setattr(routes, "ingest_actuals_csv", lambda *args: parsed.append(args))
+    assert _upload().json() == {"status": "duplicate", "upload_id": first["upload_id"]}
+    assert parsed == []
+
+    db = session_factory()
+    upload = db.get(Upload, first["upload_id"])
+    assert (upload.size_bytes, upload.row_count) == (len(csv_data), 2)
+    assert db.query(Actual).filter(Actual.company_id == company_id).count() == 4
+    audited = (
+        db.query(AuditLog.detail)
+        .filter(AuditLog.action == "actuals_uploaded")
+        .order_by(AuditLog.id)
+        .all()
+    )
+    assert [detail for (detail,) in audited[-2:]] == [
+        "feb.csv",
+        f"feb.csv (duplicate of upload {first['upload_id']})",
+    ]
+    db.close()
+    with get_blob_store().open(upload.sha256) as blob:
+        assert blob.read() == csv_data
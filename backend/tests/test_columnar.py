@@ -0,0 +1,79 @@
+from datetime import date, datetime
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.services.columnar import ACTUAL_SCHEMA, encode_batches, forecast_table, record_batches
+from app.services.finance import KPIResult, forecast
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+LAST = KPIResult(date(2024, 6, 1), 120_000, 72_000, 0.6, 90_000, -18_000, 18_000, 2_000_000, 111)
+
+
+def test_forecast_table_matches_forecast_per_scenario():
+    scenarios = {
+        "Base": {"revenue_growth": 0.05, "gross_margin": 0.6, "opex_growth": 0.03},
+        "Downside": {"revenue_growth": -0.02, "gross_margin": 0.5, "opex_growth": 0.02},
+    }
+    table = forecast_table(LAST, 6, scenarios).to_pylist()
+    for name, drivers in scenarios.items():
+        expected = forecast([LAST], 6, **drivers)
+        rows = [row for row in table if row["scenario"] == name]
+        assert [row["period"] for row in rows] == [kpi.period for kpi in expected]
+        assert [row["runway_months"] for row in rows] == [kpi.runway_months for kpi in expected]
+
+
+def test_parquet_and_arrow_round_trip_in_batches():
+    rows = [(1, date(2024, month, 1), "Revenue", float(month)) for month in range(1, 8)]
+    batches = list(record_batches(ACTUAL_SCHEMA, rows, batch_rows=3))
+    assert [batch.num_rows for batch in batches] == [3, 3, 1]
+
+    parquet = b"".join(encode_batches("parquet", ACTUAL_SCHEMA, batches))
+    parquet_file = pq.ParquetFile(BytesIO(parquet))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().to_pylist()[-1]["amount"] == 7.0
+
+    arrow = b"".join(encode_batches("arrow", ACTUAL_SCHEMA, batches))
+    assert pa.ipc.open_stream(arrow).read_all().schema == ACTUAL_SCHEMA
+
+
+def test_parquet_upload_and_columnar_exports():
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    upload = pa.table(
+        {
+            "period": pa.array([datetime(2024, 2, 1), datetime(2024, 2, 1)], pa.timestamp("us")),
+            "category": ["Revenue", "Cash"],
+            "amount": [1500.0, 4000.0],
+        }
+    )
+    buffer = BytesIO()
+    pq.write_table(upload, buffer)
+    files = {"file": ("feb.parquet", BytesIO(buffer.getvalue()), "application/octet-stream")}
+    response = client.post(f"/companies/{company_id}/actuals", headers=headers, files=files)
+    assert response.status_code == 200
+
+    kpis = client.get(
+        f"/companies/{company_id}/kpis/export", headers=headers, params={"format": "parquet"}
+    )
+    assert kpis.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pq.read_table(BytesIO(kpis.content))
+    assert table.column("revenue").to_pylist() == [1000.0, 1500.0]
+    assert table.schema.field("period").type == pa.date32()
+
+    forecast_export = client.get(
+        f"/companies/{company_id}/forecast/export",
+        headers=headers,
+        params={"format": "arrow", "months": 3},
+    )
+    forecast_rows = pa.ipc.open_stream(forecast_export.content).read_all()
+    assert forecast_rows.num_rows == 9
+    assert set(forecast_rows.column("scenario").to_pylist()) == {"Base", "Upside", "Downside"}
+
+    bad = {"file": ("bad.parquet", BytesIO(b"not parquet"), "application/octet-stream")}
+    assert (
+        client.post(f"/companies/{company_id}/actuals", headers=headers, files=bad).status_code
+        == 400
+    )
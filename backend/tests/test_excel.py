@@ -3,7 +3,7 @@ import zipfile
 from io import BytesIO
 from xml.etree import ElementTree
 
-from app.excel.exporter import SHEETS, build_workbook
+from app.excel.exporter import SHEETS, build_workbook, spool_workbook
 from app.services.finance import KPIResult
 
 
@@ -67,3 +67,36 @@ def test_excel_contains_expected_strings():
     assert "TestCo" in shared_strings
     assert "Generated by Portfolio Reporting Studio" in shared_strings
     assert "ending_runway_months" in shared_strings
+
+
+def test_spooled_constant_memory_workbook():
+    kpis = [
+        KPIResult(
+            period=date(2024, month, 1),
+            revenue=100 * month,
+            gross_profit=60,
+            gross_margin=0.6,
+            opex=40,
+            ebitda=20,
+            burn=0,
+            cash_balance=1000,
+            runway_months=12,
+        )
+        for month in range(1, 4)
+    ]
+    with spool_workbook(
+        "TestCo",
+        kpis,
+        kpis,
+        [{"name": "Base", "revenue_growth": 0.05}],
+        [{"name": "Base", "ending_revenue": 120}],
+        [],
+        [{"revenue_growth": 0.05, "gross_margin": 0.6, "runway_months": 12}],
+    ) as spooled:
+        data = spooled.read()
+    with zipfile.ZipFile(BytesIO(data)) as workbook:
+        names = workbook.namelist()
+        pnl = workbook.read("xl/worksheets/sheet2.xml").decode("utf-8")
+    assert "xl/sharedStrings.xml" not in names
+    assert pnl.count("<row ") == 4
+    assert "runway_months" in pnl
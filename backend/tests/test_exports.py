@@ -0,0 +1,75 @@
+import csv
+import json
+from io import BytesIO, StringIO
+
+from app.models.entities import Company
+from app.services import exports
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+
+def test_encoders_emit_one_chunk_per_batch(monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_BATCH_ROWS", 2)
+    rows = [(1, "a"), (2, "b"), (3, "c")]
+    csv_chunks = list(exports.encode_csv(["id", "name"], iter(rows)))
+    assert len(csv_chunks) == 2
+    assert list(csv.reader(StringIO(b"".join(csv_chunks).decode()))) == [
+        ["id", "name"],
+        ["1", "a"],
+        ["2", "b"],
+        ["3", "c"],
+    ]
+    ndjson_chunks = list(exports.encode_ndjson(["id", "name"], iter(rows)))
+    assert len(ndjson_chunks) == 2
+    assert [json.loads(line) for line in b"".join(ndjson_chunks).splitlines()][-1] == {
+        "id": 3,
+        "name": "c",
+    }
+
+
+def test_company_and_portfolio_exports_stream_csv_and_ndjson():
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    second_id = client.post("/companies", headers=headers, json={"name": "Beta"}).json()["id"]
+    csv_data = "period,category,amount\n2024-01-01,Revenue,250\n"
+    files = {"file": ("actuals.csv", BytesIO(csv_data.encode("utf-8")), "text/csv")}
+    client.post(f"/companies/{second_id}/actuals", headers=headers, files=files)
+
+    actuals = client.get(f"/companies/{company_id}/actuals/export", headers=headers)
+    assert actuals.headers["content-type"].startswith("text/csv")
+    assert actuals.text.splitlines() == [
+        "company_id,period,category,amount",
+        f"{company_id},2024-01-01,Revenue,1000.0",
+        f"{company_id},2024-01-01,Cash,5000.0",
+    ]
+
+    kpis = client.get("/portfolio/kpis/export", headers=headers, params={"format": "ndjson"})
+    assert kpis.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in kpis.text.splitlines()]
+    assert [(row["company_id"], row["period"], row["revenue"]) for row in rows] == [
+        (company_id, "2024-01-01", 1000.0),
+        (second_id, "2024-01-01", 250.0),
+    ]
+    portfolio = client.get("/portfolio/actuals/export", headers=headers)
+    assert len(portfolio.text.splitlines()) == 4
+
+    assert client.get("/companies/999/kpis/export", headers=headers).status_code == 404
+    assert (
+        client.get(
+            f"/companies/{company_id}/kpis/export", headers=headers, params={"format": "xml"}
+        ).status_code
+        == 422
+    )
+
+
+def test_export_rows_outlive_the_request_session():
+    client, session_factory = _client()
+    headers, company_id = _setup(client)
+    db = session_factory()
+    org_id = db.get(Company, company_id).org_id
+    db.commit()
+    rows = exports.actual_rows(db, org_id, company_id)
+    # The request's session never holds the export cursor, so closing it can't cut the body off.
+    assert not db.in_transaction()
+    db.close()
+    assert [tuple(row[2:]) for row in rows] == [("Revenue", 1000.0), ("Cash", 5000.0)]
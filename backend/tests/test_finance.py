@@ -1,6 +1,19 @@
 from datetime import date
 
-from app.services.finance import ActualRecord, compute_kpis, forecast
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.finance import (
+    ActualRecord,
+    Distribution,
+    compute_kpi_frame,
+    compute_kpis,
+    compute_portfolio_kpis,
+    forecast,
+    sensitivity_grid,
+    simulate_forecast,
+)
 
 
 def test_compute_kpis_runway():
@@ -26,3 +39,161 @@ def test_forecast_length():
     kpis = compute_kpis(actuals)
     forecasted = forecast(kpis, 12, 0.05, 0.6, 0.03)
     assert len(forecasted) == 12
+
+
+def test_compute_kpis_trailing_runway():
+    actuals = []
+    for month, (revenue, opex, cash) in enumerate(
+        [(1000, 1300, 9000), (1000, 1600, 8000), (1000, 1900, 7000), (1000, 2200, 6000)], start=1
+    ):
+        actuals += [
+            ActualRecord(date(2024, month, 1), "Revenue", revenue),
+            ActualRecord(date(2024, month, 1), "G&A", opex),
+            ActualRecord(date(2024, month, 1), "Cash", cash),
+        ]
+    kpis = compute_kpis(reversed(actuals))
+    assert [k.period for k in kpis] == [date(2024, m, 1) for m in range(1, 5)]
+    assert [k.burn for k in kpis] == [300, 600, 900, 1200]
+    assert kpis[0].runway_months == 9000 / 300
+    assert kpis[1].runway_months == 8000 / 450
+    assert kpis[3].runway_months == 6000 / 900
+
+
+def test_kpi_frame_adapter_matches_columns():
+    actuals = [
+        ActualRecord(date(2024, 1, 1), "Revenue", 500),
+        ActualRecord(date(2024, 1, 1), "Revenue", 500),
+        ActualRecord(date(2024, 1, 1), "Unmapped", 999),
+        ActualRecord(date(2024, 2, 1), "COGS", 100),
+    ]
+    frame = compute_kpi_frame(actuals)
+    assert len(frame) == 2
+    assert frame.revenue.tolist() == [1000, 0]
+    assert frame.gross_margin.tolist() == [1.0, 0.0]
+    results = frame.to_results()
+    assert results[1].period == date(2024, 2, 1)
+    assert results[1].gross_profit == -100
+    assert compute_kpis([]) == []
+
+
+def test_portfolio_kpis_match_per_company_runs():
+    portfolio = {
+        7: [(month, 1000, 1300 + 200 * month, 9000 - 500 * month) for month in range(1, 6)],
+        3: [(1, 500, 400, 2000)],
+        5: [(month, 800, 900, 4000) for month in (2, 4)],
+    }
+    records = {
+        company_id: [
+            ActualRecord(date(2024, month, 1), category, amount)
+            for month, revenue, opex, cash in rows
+            for category, amount in (("Revenue", revenue), ("G&A", opex), ("Cash", cash))
+        ]
+        for company_id, rows in portfolio.items()
+    }
+    frame = pd.DataFrame(
+        [
+            (company_id, r.period, r.category, r.amount)
+            for company_id, rows in records.items()
+            for r in rows
+        ],
+        columns=["company_id", "period", "category", "amount"],
+    )
+    snapshots = compute_portfolio_kpis(frame)
+    assert [s.company_id for s in snapshots] == [3, 5, 7]
+    for snapshot in snapshots:
+        expected = compute_kpis(records[snapshot.company_id])
+        assert snapshot.latest == expected[-1]
+        assert snapshot.prior == (expected[-2] if len(expected) > 1 else None)
+    assert compute_portfolio_kpis(frame.iloc[:0]) == []
+
+
+def _loop_forecast(last, months, revenue_growth, gross_margin, opex_growth):
+    revenue, opex, cash = last.revenue, last.opex, last.cash_balance
+    rows = []
+    for _ in range(months):
+        revenue *= 1 + revenue_growth
+        opex *= 1 + opex_growth
+        burn = max(0.0, -(revenue * gross_margin - opex))
+        cash = max(0.0, cash - burn)
+        rows.append((revenue, opex, burn, cash, cash / max(1.0, burn)))
+    return rows
+
+
+def test_forecast_matches_month_by_month_loop():
+    actuals = [
+        ActualRecord(date(2024, 1, 15), "Revenue", 1000),
+        ActualRecord(date(2024, 1, 15), "Sales & Marketing", 1400),
+        ActualRecord(date(2024, 1, 15), "Cash", 2500),
+    ]
+    kpis = compute_kpis(actuals)
+    forecasted = forecast(kpis, 36, 0.02, 0.55, 0.04)
+    assert forecasted[0].period == date(2024, 2, 1)
+    assert forecasted[-1].period == date(2027, 1, 1)
+    expected = _loop_forecast(kpis[-1], 36, 0.02, 0.55, 0.04)
+    assert [
+        (k.revenue, k.opex, k.burn, k.cash_balance, k.runway_months) for k in forecasted
+    ] == expected
+    assert forecasted[-1].cash_balance == 0.0
+
+
+def test_sensitivity_grid_orders_revenue_growth_outer():
+    kpis = compute_kpis([ActualRecord(date(2024, 1, 1), "Revenue", 1000)])
+    grid = sensitivity_grid(kpis, [-0.05, 0.05], [0.4, 0.5, 0.6], opex_growth=0.03, months=6)
+    assert [(g["revenue_growth"], g["gross_margin"]) for g in grid] == [
+        (rg, gm) for rg in [-0.05, 0.05] for gm in [0.4, 0.5, 0.6]
+    ]
+    for cell in grid:
+        expected = forecast(kpis, 6, cell["revenue_growth"], cell["gross_margin"], 0.03)
+        assert cell["runway_months"] == expected[-1].runway_months
+    assert sensitivity_grid([], [0.1], [0.5], 0.0) == [
+        {"revenue_growth": 0.1, "gross_margin": 0.5, "runway_months": 0.0}
+    ]
+
+
+def test_simulation_is_seeded_and_collapses_to_forecast_when_fixed():
+    kpis = compute_kpis(
+        [
+            ActualRecord(date(2024, 1, 1), "Revenue", 1000),
+            ActualRecord(date(2024, 1, 1), "G&A", 1500),
+            ActualRecord(date(2024, 1, 1), "Cash", 4000),
+        ]
+    )
+    fixed = simulate_forecast(
+        kpis[-1],
+        12,
+        Distribution("fixed", (0.02,)),
+        Distribution("fixed", (0.6,)),
+        Distribution("fixed", (0.01,)),
+        paths=50,
+    )
+    expected = forecast(kpis, 12, 0.02, 0.6, 0.01)
+    runways = [k.runway_months for k in expected]
+    assert fixed.runway_percentiles[2].tolist() == pytest.approx(runways)
+    assert fixed.cash_out_probability.tolist() == [float(k.cash_balance == 0) for k in expected]
+
+    drivers = (
+        Distribution("normal", (0.02, 0.05)),
+        Distribution("triangular", (0.3, 0.5, 0.7)),
+        Distribution("uniform", (0.0, 0.03)),
+    )
+    first = simulate_forecast(kpis[-1], 24, *drivers, paths=2_000, seed=7)
+    second = simulate_forecast(kpis[-1], 24, *drivers, paths=2_000, seed=7)
+    assert first.to_rows() == second.to_rows()
+    assert np.all(np.diff(first.cash_out_probability) >= 0)
+    with pytest.raises(ValueError):
+        Distribution("normal", (0.1,))
+
+
+@pytest.mark.parametrize(
+    "kind, params",
+    [
+        ("normal", (0.1, -0.01)),
+        ("uniform", (0.5, 0.4)),
+        ("triangular", (0.6, 0.5, 0.7)),
+        ("triangular", (0.5, 0.5, 0.5)),
+        ("fixed", (float("nan"),)),
+    ],
+)
+def test_distribution_rejects_invalid_params(kind, params):
+    with pytest.raises(ValueError):
+        Distribution(kind, params)
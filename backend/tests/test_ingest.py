@@ -0,0 +1,64 @@
+from datetime import date
+from io import BytesIO
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import Actual, Company, Organization
+from app.services.ingest import IngestError, ingest_actuals_csv
+
+
+def _session():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Acme")
+    db.add(company)
+    db.flush()
+    return db, company.id
+
+
+def test_ingest_maps_and_inserts_in_chunks():
+    db, company_id = _session()
+    csv_data = (
+        "period,category,amount\n"
+        "2024-01-01,Revenue,1000\n"
+        "2024-01-01,4000 Hosting,250.5\n"
+        "2024-02-01,Cash,9000\n"
+    )
+    result = ingest_actuals_csv(
+        db, company_id, BytesIO(csv_data.encode()), {"4000 Hosting": "COGS"}, chunk_rows=2
+    )
+    assert result.rows == 3
+    assert result.periods == {date(2024, 1, 1), date(2024, 2, 1)}
+    rows = db.query(Actual.period, Actual.category, Actual.amount).order_by(Actual.id).all()
+    assert rows == [
+        (date(2024, 1, 1), "Revenue", 1000.0),
+        (date(2024, 1, 1), "COGS", 250.5),
+        (date(2024, 2, 1), "Cash", 9000.0),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("csv_data", "message"),
+    [
+        ("period,amount\n2024-01-01,1\n", "CSV must include period, category, amount"),
+        ("period,category,amount\n2024-01-01,Travel,1\n", "Category 'Travel' missing mapping"),
+        ("period,category,amount\n01/02/2024,Revenue,1\n", "Invalid period '01/02/2024'"),
+        ("period,category,amount\n2024-01-01,Revenue,n/a\n", "Invalid amount 'n/a'"),
+        ("", "CSV is empty"),
+        ("period,category,amount\n2024-01-01,Revenue,1\n2024-02-01,Revenue,1,2,3\n", "valid UTF-8"),
+        ("period,category,amount\n2024-01-01,Caf\udce9,1\n", "valid UTF-8"),
+    ],
+)
+def test_ingest_rejects_invalid_rows(csv_data, message):
+    db, company_id = _session()
+    with pytest.raises(IngestError, match=message):
+        ingest_actuals_csv(
+            db, company_id, BytesIO(csv_data.encode(errors="surrogateescape")), {}
+        )
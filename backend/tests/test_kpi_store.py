@@ -0,0 +1,115 @@
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import Actual, Company, CompanyKPI, Organization
+from app.services import kpi_store
+from app.services.finance import ActualRecord, compute_kpis
+from app.services.kpi_store import load_company_kpis, load_latest_kpis, refresh_company_kpis
+from app.services.packs import pack_fingerprint
+from app.services.response_cache import lookup_response
+
+
+def _session():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _add(db, company_id, month, category, amount):
+    db.add(
+        Actual(company_id=company_id, period=date(2024, month, 1), category=category, amount=amount)
+    )
+
+
+def test_refresh_only_rewrites_affected_periods():
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Acme")
+    db.add(company)
+    db.flush()
+    for month in range(1, 7):
+        _add(db, company.id, month, "Revenue", 1000)
+        _add(db, company.id, month, "G&A", 1000 + month * 100)
+        _add(db, company.id, month, "Cash", 10000 - month * 500)
+    assert refresh_company_kpis(db, company.id, [date(2024, m, 1) for m in range(1, 7)]) == 6
+    db.commit()
+    ids = {k.period: k.id for k in db.query(CompanyKPI).all()}
+
+    _add(db, company.id, 3, "G&A", 2000)
+    assert refresh_company_kpis(db, company.id, [date(2024, 3, 1)]) == 3
+    db.commit()
+
+    rewritten = {k.period for k in db.query(CompanyKPI).all() if ids.get(k.period) != k.id}
+    assert rewritten == {date(2024, 3, 1), date(2024, 4, 1), date(2024, 5, 1)}
+    expected = compute_kpis(ActualRecord(a.period, a.category, a.amount) for a in db.query(Actual))
+    assert load_company_kpis(db, company.id) == expected
+
+    [(name, snapshot)] = load_latest_kpis(db, org.id)
+    assert name == "Acme"
+    assert snapshot.latest == expected[-1]
+    assert snapshot.prior == expected[-2]
+
+
+def test_backfill_matches_per_company_kpis_in_batches(monkeypatch):
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    companies = [Company(org_id=org.id, name=name) for name in ("Acme", "Beta", "Empty")]
+    db.add_all(companies)
+    db.flush()
+    for offset, company in enumerate(companies[:2]):
+        for month in range(1, 5):
+            _add(db, company.id, month, "Revenue", 1000 * (offset + 1))
+            _add(db, company.id, month, "G&A", 1200 + month * 100 * offset)
+            _add(db, company.id, month, "Cash", 9000 - month * 400)
+    stale = compute_kpis([ActualRecord(date(2023, 1, 1), "Revenue", 1)])[0]
+    db.add(CompanyKPI(company_id=companies[2].id, **stale.__dict__))
+    db.commit()
+    batches = []
+    monkeypatch.setattr(kpi_store, "BACKFILL_BATCH_COMPANIES", 2)
+    monkeypatch.setattr(kpi_store, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    rebuild = kpi_store.rebuild_portfolio_kpis
+    monkeypatch.setattr(
+        kpi_store,
+        "rebuild_portfolio_kpis",
+        lambda session, ids: batches.append(ids) or rebuild(session, ids),
+    )
+    kpi_store.backfill()
+
+    assert batches == [[companies[0].id, companies[1].id], [companies[2].id]]
+    for company in companies[:2]:
+        actuals = db.query(Actual.period, Actual.category, Actual.amount).filter(
+            Actual.company_id == company.id
+        )
+        assert load_company_kpis(db, company.id) == compute_kpis(
+            ActualRecord(*row) for row in actuals
+        )
+    assert load_company_kpis(db, companies[2].id) == []
+
+
+def test_backfill_changes_pack_fingerprint_and_bumps_versions(monkeypatch):
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Acme")
+    db.add(company)
+    db.flush()
+    _add(db, company.id, 1, "Revenue", 1000)
+    _add(db, company.id, 1, "Cash", 5000)
+    db.commit()
+    before = pack_fingerprint(db, company.id)
+    version = lookup_response("kpis", org.id, company.id).etag
+
+    monkeypatch.setattr(kpi_store, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    kpi_store.backfill()
+
+    assert load_company_kpis(db, company.id)[0].revenue == 1000
+    assert pack_fingerprint(db, company.id) != before
+    assert lookup_response("kpis", org.id, company.id).etag != version
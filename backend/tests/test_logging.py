@@ -0,0 +1,58 @@
+import io
+import json
+import logging
+
+import pytest
+
+from app.core import logging as app_logging
+from app.core.request_id import request_id_ctx
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    stream = io.StringIO()
+    root = logging.getLogger()
+    saved = root.handlers, root.level
+
+    def setup(**overrides) -> io.StringIO:
+        for name, value in overrides.items():
+            monkeypatch.setattr(app_logging.settings, name, value)
+        app_logging.setup_logging(stream)
+        return stream
+
+    yield setup
+    app_logging.stop_logging()
+    root.handlers, root.level = saved
+
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    app_logging.stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_queued_records_keep_request_id_and_traceback(capture):
+    stream = capture(log_queue=True, log_info_sample_rate=1.0)
+    token = request_id_ctx.set("req-1")
+    try:
+        logging.getLogger("t").info("built %s", "pack")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("t").exception("failed")
+    finally:
+        request_id_ctx.reset(token)
+    info, error = _lines(stream)
+    assert info["message"] == "built pack"
+    assert info["request_id"] == error["request_id"] == "req-1"
+    assert "ValueError: boom" in error["exception"]
+
+
+def test_sampling_drops_info_by_request_but_keeps_warnings(capture):
+    stream = capture(log_queue=False, log_info_sample_rate=0.0)
+    token = request_id_ctx.set("req-2")
+    try:
+        logging.getLogger("t").info("noise")
+        logging.getLogger("t").warning("slow")
+    finally:
+        request_id_ctx.reset(token)
+    assert [line["message"] for line in _lines(stream)] == ["slow"]
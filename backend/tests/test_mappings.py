@@ -0,0 +1,66 @@
+from io import BytesIO, StringIO
+
+from app.models.entities import Company, Mapping, Organization
+from app.services.mappings import import_mappings_csv, upsert_mappings
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+from tests.test_query_plans import _session
+
+
+def _company(db) -> int:
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Acme")
+    db.add(company)
+    db.flush()
+    return company.id
+
+
+def test_import_diffs_against_existing_mappings():
+    db = _session()
+    company_id = _company(db)
+    upsert_mappings(db, company_id, {"4000": "Revenue", "5000": "COGS"})
+    csv_data = (
+        "source_account,canonical_category\n4000,Revenue\n5000,Other OpEx\n6000,G&A\n6000,G&A\n"
+    )
+    result = import_mappings_csv(db, company_id, StringIO(csv_data))
+    assert (result.inserted, result.updated, result.unchanged, result.errors) == (1, 1, 1, [])
+    assert dict(db.query(Mapping.source_account, Mapping.canonical_category)) == {
+        "4000": "Revenue",
+        "5000": "Other OpEx",
+        "6000": "G&A",
+    }
+
+
+def test_import_reports_every_invalid_row_and_writes_nothing():
+    db = _session()
+    company_id = _company(db)
+    csv_data = "source_account,canonical_category\n4000,Revenue\n,COGS\n5000,Travel\n4000,COGS\n"
+    result = import_mappings_csv(db, company_id, StringIO(csv_data))
+    assert [(error["line"], error["source_account"]) for error in result.errors] == [
+        (3, ""),
+        (4, "5000"),
+        (5, "4000"),
+    ]
+    assert db.query(Mapping).count() == 0
+
+
+def test_import_route_returns_counts_or_row_errors():
+    client, _ = _client()
+    headers, company_id = _setup(client)
+
+    def _import(csv_data: str):
+        files = {"file": ("mappings.csv", BytesIO(csv_data.encode("utf-8")), "text/csv")}
+        return client.post(f"/companies/{company_id}/mappings/import", headers=headers, files=files)
+
+    ok = _import("source_account,canonical_category\n4000,Revenue\n5000,COGS\n")
+    assert ok.status_code == 200
+    assert ok.json() == {"status": "ok", "inserted": 2, "updated": 0, "unchanged": 0}
+
+    rejected = _import("source_account,canonical_category\n4000,COGS\n6000,Travel\n")
+    assert rejected.status_code == 400
+    assert [error["line"] for error in rejected.json()["detail"]["errors"]] == [3]
+
+    missing = _import("account,category\n4000,Revenue\n")
+    assert missing.status_code == 400
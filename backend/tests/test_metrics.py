@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+
+from app.core.metrics import render_metrics
+from tests.conftest import ROOT
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_cover_requests_packs_ingest_and_caches():
+    before = {
+        "latency": _sample(
+            "http_request_duration_seconds_count",
+            method="GET",
+            route="/companies/{company_id}/pack",
+            status="200",
+        ),
+        "builds": _sample("pack_build_duration_seconds_count"),
+        "pack_miss": _sample("cache_requests_total", cache="pack", result="miss"),
+        "pack_hit": _sample("cache_requests_total", cache="pack", result="hit"),
+        "ingested": _sample("ingest_rows_total", format="csv"),
+    }
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    for _ in range(2):
+        assert client.get(f"/companies/{company_id}/pack", headers=headers).status_code == 200
+
+    body = client.get("/metrics")
+    assert body.status_code == 200
+    assert body.headers["content-type"].startswith("text/plain")
+    assert b"kpi_compute_duration_seconds_bucket" in body.content
+    assert b"forecast_duration_seconds_bucket" in body.content
+    route = "/companies/{company_id}/pack"
+    latency = _sample(
+        "http_request_duration_seconds_count", method="GET", route=route, status="200"
+    )
+    assert latency - before["latency"] == 2
+    assert _sample("pack_build_duration_seconds_count") - before["builds"] == 1
+    assert _sample("cache_requests_total", cache="pack", result="miss") - before["pack_miss"] == 1
+    assert _sample("cache_requests_total", cache="pack", result="hit") - before["pack_hit"] == 1
+    assert _sample("ingest_rows_total", format="csv") > before["ingested"]
+
+
+def test_multiprocess_collector_sums_across_workers(monkeypatch, tmp_path):
+    worker = "from app.core.metrics import record_cache; record_cache('pack', True)"
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", worker],
+            cwd=ROOT,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""},
+            check=True,
+        )
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    body, _ = render_metrics()
+    assert 'cache_requests_total{cache="pack",result="hit"} 2.0' in body.decode()
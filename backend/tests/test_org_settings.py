@@ -0,0 +1,53 @@
+from sqlalchemy import event
+
+from app.models.entities import Organization
+from app.services.org_settings import load_org_settings, org_settings_cache, save_org_settings
+from tests.test_query_plans import _session
+
+
+def _count_settings_queries(db) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if "organization_settings" in statement and statement.lstrip().startswith("SELECT"):
+            statements.append(statement)
+
+    return statements
+
+
+def test_settings_are_memoized_per_session_and_cached_per_process():
+    org_settings_cache.clear()
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.commit()
+    load_org_settings(db, org.id)
+    org_settings_cache.clear()
+    db.info.clear()
+    selects = _count_settings_queries(db)
+
+    first = load_org_settings(db, org.id)
+    assert load_org_settings(db, org.id) is first
+    assert first.runway_risk_threshold == 6.0
+    db.info.clear()
+    assert load_org_settings(db, org.id) == first
+    assert len(selects) == 1
+
+
+def test_save_invalidates_cached_settings():
+    org_settings_cache.clear()
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.commit()
+    load_org_settings(db, org.id)
+
+    save_org_settings(
+        db,
+        org.id,
+        {"runway_risk_threshold": 12.0, "revenue_drop_threshold": -0.2, "margin_drop_threshold": 0},
+    )
+    assert org_settings_cache.get(org.id) is None
+    db.info.clear()
+    assert load_org_settings(db, org.id).runway_risk_threshold == 12.0
@@ -0,0 +1,225 @@
+import multiprocessing
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from app.core.cache import get_cache
+from app.jobs.tasks import build_pack
+from app.services import packs
+from tests.test_api_integration import _client
+
+
+def _setup(client):
+    client.post(
+        "/auth/register",
+        params={"org_name": "Jobs Org", "email": "jobs@example.com", "password": "pass"},
+    )
+    login = client.post("/auth/login", params={"email": "jobs@example.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    company_id = client.post("/companies", headers=headers, json={"name": "Acme"}).json()["id"]
+    csv_data = "period,category,amount\n2024-01-01,Revenue,1000\n2024-01-01,Cash,5000\n"
+    files = {"file": ("actuals.csv", BytesIO(csv_data.encode("utf-8")), "text/csv")}
+    client.post(f"/companies/{company_id}/actuals", headers=headers, files=files)
+    return headers, company_id
+
+
+def test_pack_job_builds_once_and_serves_cached_bytes(monkeypatch):
+    get_cache().flushdb()
+    client, session_factory = _client()
+    monkeypatch.setattr("app.jobs.tasks.SessionLocal", session_factory)
+    builds = []
+    render = packs.render_pack_file
+
+    def _counting_render(inputs):
+        builds.append(inputs.company_id)
+        return render(inputs)
+
+    monkeypatch.setattr(packs, "render_pack_file", _counting_render)
+    headers, company_id = _setup(client)
+
+    submitted = client.post(f"/companies/{company_id}/pack/jobs", headers=headers)
+    assert submitted.status_code == 200
+    job_id = submitted.json()["job_id"]
+    assert submitted.json()["status"] == "SUCCESS"
+    status = client.get(f"/companies/{company_id}/pack/jobs/{job_id}", headers=headers)
+    assert status.json() == {"job_id": job_id, "status": "SUCCESS"}
+
+    download = client.get(f"/companies/{company_id}/pack/jobs/{job_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.content[:2] == b"PK"
+    again = client.post(f"/companies/{company_id}/pack/jobs", headers=headers)
+    assert again.json()["job_id"] == job_id
+    direct = client.get(f"/companies/{company_id}/pack", headers=headers)
+    assert direct.content == download.content
+    assert builds == [company_id]
+
+    client.post(
+        f"/companies/{company_id}/scenarios",
+        headers=headers,
+        json={"name": "Base", "revenue_growth": 0.2, "gross_margin": 0.7, "opex_growth": 0.01},
+    )
+    changed = client.post(f"/companies/{company_id}/pack/jobs", headers=headers)
+    assert changed.json()["job_id"] != job_id
+    assert builds == [company_id, company_id]
+
+
+def test_pack_routes_hide_other_orgs_companies(monkeypatch):
+    get_cache().flushdb()
+    client, session_factory = _client()
+    monkeypatch.setattr("app.jobs.tasks.SessionLocal", session_factory)
+    headers, company_id = _setup(client)
+    job_id = client.post(f"/companies/{company_id}/pack/jobs", headers=headers).json()["job_id"]
+    client.post(
+        "/auth/register",
+        params={"org_name": "Other Org", "email": "other@example.com", "password": "pass"},
+    )
+    token = client.post(
+        "/auth/login", params={"email": "other@example.com", "password": "pass"}
+    ).json()["access_token"]
+    foreign = {"Authorization": f"Bearer {token}"}
+
+    base = f"/companies/{company_id}/pack"
+    assert client.get(base, headers=foreign).status_code == 404
+    assert client.post(f"{base}/jobs", headers=foreign).status_code == 404
+    assert client.get(f"{base}/jobs/{job_id}", headers=foreign).status_code == 404
+    assert client.get(f"{base}/jobs/{job_id}/download", headers=foreign).status_code == 404
+    assert client.get(f"{base}/jobs/{job_id}/download", headers=headers).status_code == 200
+
+
+def test_pack_job_download_before_ready_is_404():
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    response = client.get(f"/companies/{company_id}/pack/jobs/unknown/download", headers=headers)
+    assert response.status_code == 404
+
+
+def test_portfolio_packs_stream_one_workbook_per_company():
+    get_cache().flushdb()
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    second_id = client.post("/companies", headers=headers, json={"name": "Beta"}).json()["id"]
+    client.post(
+        f"/companies/{second_id}/actuals",
+        headers=headers,
+        files={"file": ("a.csv", BytesIO(b"period,category,amount\n2024-01-01,Revenue,5\n"))},
+    )
+    cached = client.get(f"/companies/{company_id}/pack", headers=headers).content
+
+    response = client.get("/portfolio/packs", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert sorted(archive.namelist()) == [
+            f"company_{company_id}_pack.xlsx",
+            f"company_{second_id}_pack.xlsx",
+        ]
+        assert archive.read(f"company_{company_id}_pack.xlsx") == cached
+        assert archive.read(f"company_{second_id}_pack.xlsx")[:2] == b"PK"
+
+
+def test_simulation_endpoint_and_pack_sheet():
+    get_cache().flushdb()
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    payload = {
+        "revenue_growth": {"kind": "normal", "params": [0.02, 0.01]},
+        "gross_margin": {"kind": "uniform", "params": [0.5, 0.7]},
+        "opex_growth": {"kind": "fixed", "params": [0.01]},
+        "months": 6,
+        "paths": 500,
+        "seed": 11,
+    }
+    first = client.post(f"/companies/{company_id}/simulations", headers=headers, json=payload)
+    assert first.status_code == 200
+    months = first.json()["months"]
+    assert len(months) == 6
+    assert set(months[0]) >= {"period", "runway_p5", "runway_p50", "cash_out_probability"}
+    again = client.post(f"/companies/{company_id}/simulations", headers=headers, json=payload)
+    assert again.json() == first.json()
+
+    payload["gross_margin"] = {"kind": "normal", "params": [0.5]}
+    invalid = client.post(f"/companies/{company_id}/simulations", headers=headers, json=payload)
+    assert invalid.status_code == 400
+    payload["gross_margin"] = {"kind": "normal", "params": [0.5, -0.1]}
+    invalid = client.post(f"/companies/{company_id}/simulations", headers=headers, json=payload)
+    assert invalid.status_code == 400
+    payload["gross_margin"] = {"kind": "uniform", "params": [0.5, 0.7]}
+    too_big = {**payload, "paths": 100_000, "months": 120}
+    oversized = client.post(f"/companies/{company_id}/simulations", headers=headers, json=too_big)
+    assert oversized.status_code == 422
+    negative_seed = {**payload, "seed": -1}
+    rejected = client.post(
+        f"/companies/{company_id}/simulations", headers=headers, json=negative_seed
+    )
+    assert rejected.status_code == 422
+
+    client.post(
+        "/auth/register",
+        params={"org_name": "Other Org", "email": "other@example.com", "password": "pass"},
+    )
+    token = client.post(
+        "/auth/login", params={"email": "other@example.com", "password": "pass"}
+    ).json()["access_token"]
+    foreign = client.post(
+        f"/companies/{company_id}/simulations",
+        headers={"Authorization": f"Bearer {token}"},
+        json=payload,
+    )
+    assert foreign.status_code == 404
+
+    pack = client.get(f"/companies/{company_id}/pack", params={"simulate": True}, headers=headers)
+    with zipfile.ZipFile(BytesIO(pack.content)) as workbook:
+        assert b"Monte Carlo" in workbook.read("xl/workbook.xml")
+    plain = client.get(f"/companies/{company_id}/pack", headers=headers)
+    with zipfile.ZipFile(BytesIO(plain.content)) as workbook:
+        assert b"Monte Carlo" not in workbook.read("xl/workbook.xml")
+
+
+def test_large_pack_streams_from_spooled_file_without_caching(monkeypatch):
+    get_cache().flushdb()
+    client, session_factory = _client()
+    headers, company_id = _setup(client)
+    monkeypatch.setattr("app.api.routes.settings.pack_cache_max_bytes", 0)
+    response = client.get(f"/companies/{company_id}/pack", headers=headers)
+    assert response.status_code == 200
+    assert response.content[:2] == b"PK"
+    db = session_factory()
+    try:
+        fingerprint = packs.pack_fingerprint(db, company_id)
+    finally:
+        db.close()
+    assert packs.get_cached_pack(company_id, fingerprint) is None
+
+
+def test_oversized_packs_are_never_cached(monkeypatch):
+    get_cache().flushdb()
+    client, session_factory = _client()
+    monkeypatch.setattr("app.jobs.tasks.SessionLocal", session_factory)
+    headers, company_id = _setup(client)
+    monkeypatch.setattr(packs.settings, "pack_cache_max_bytes", 0)
+    db = session_factory()
+    try:
+        fingerprint = packs.pack_fingerprint(db, company_id)
+    finally:
+        db.close()
+
+    with pytest.raises(ValueError, match="PACK_CACHE_MAX_BYTES"):
+        build_pack.run(company_id, fingerprint)
+    response = client.get("/portfolio/packs", headers=headers)
+    with zipfile.ZipFile(BytesIO(response.content)) as archive:
+        assert archive.read(f"company_{company_id}_pack.xlsx")[:2] == b"PK"
+    assert packs.get_cached_pack(company_id, fingerprint) is None
+
+
+def test_portfolio_exports_reuse_one_pool_outside_this_process():
+    client, _ = _client()
+    headers, _company_id = _setup(client)
+    pool = packs.pack_pool.get()
+    for _ in range(2):
+        get_cache().flushdb()
+        assert client.get("/portfolio/packs", headers=headers).status_code == 200
+    assert packs.pack_pool.get() is pool
+    workers = multiprocessing.active_children()
+    assert 0 < len(workers) <= packs.pack_pool.workers
+    assert all(isinstance(p, multiprocessing.context.ForkServerProcess) for p in workers)
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+from app.api.pagination import encode_cursor
+from app.models.entities import Actual, AuditLog
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+
+def _walk(client, path, headers, **params) -> list[list]:
+    pages, cursor = [], None
+    while True:
+        body = client.get(
+            path, headers=headers, params={**params, **({"cursor": cursor} if cursor else {})}
+        ).json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_companies_and_users_page_by_id():
+    client, _ = _client()
+    headers, first_id = _setup(client)
+    for name in ["B", "C", "D", "E"]:
+        client.post("/companies", headers=headers, json={"name": name})
+    pages = _walk(client, "/companies", headers, limit=2)
+    assert [[company["name"] for company in items] for items in pages] == [
+        ["Acme", "B"],
+        ["C", "D"],
+        ["E"],
+    ]
+    assert _walk(client, "/users", headers, limit=1) == [
+        [{"id": 1, "email": "jobs@example.com", "role": "org_admin"}]
+    ]
+
+
+def test_audit_logs_page_newest_first_across_equal_timestamps():
+    client, session_factory = _client()
+    headers, _ = _setup(client)
+    db = session_factory()
+    stamp = datetime(2030, 1, 1)
+    db.add_all(AuditLog(org_id=1, action="bulk", detail=str(i), created_at=stamp) for i in range(5))
+    db.commit()
+    db.close()
+
+    pages = _walk(client, "/audit/logs", headers, action="bulk", limit=2)
+    assert [[log["detail"] for log in items] for items in pages] == [["4", "3"], ["2", "1"], ["0"]]
+    everything = [
+        log["id"] for items in _walk(client, "/audit/logs", headers, limit=3) for log in items
+    ]
+    assert len(everything) == len(set(everything)) == 8
+
+
+def test_mapping_status_pages_unmapped_accounts():
+    client, session_factory = _client()
+    headers, company_id = _setup(client)
+    client.post(
+        f"/companies/{company_id}/mappings",
+        headers=headers,
+        params={"source_account": "4000", "canonical_category": "Revenue"},
+    )
+    db = session_factory()
+    db.add_all(
+        Actual(company_id=company_id, period=date(2024, 2, 1), category=account, amount=1)
+        for account in ["4000", "6000", "5000", "6000"]
+    )
+    db.commit()
+    db.close()
+
+    path = f"/companies/{company_id}/mappings/status"
+    assert _walk(client, path, headers, limit=1) == [["5000"], ["6000"]]
+    assert client.get(path, headers=headers).json()["mapped_count"] == 1
+    assert client.get(path, headers=headers, params={"cursor": "!!"}).status_code == 400
+
+
+def test_malformed_cursor_values_are_rejected():
+    client, _ = _client()
+    headers, _company_id = _setup(client)
+    for path, values in [
+        ("/audit/logs", ["not-a-date", 1]),
+        ("/audit/logs", [5, 1]),
+        ("/audit/logs", ["2024-01-01T00:00:00+00:00", 1]),
+        ("/audit/logs", ["2024-01-01T00:00:00", "1"]),
+        ("/companies", ["1"]),
+        ("/companies", [True]),
+    ]:
+        response = client.get(path, headers=headers, params={"cursor": encode_cursor(*values)})
+        assert response.status_code == 400, (path, values)
+    cursor = encode_cursor(datetime(2100, 1, 1), 1)
+    assert client.get("/audit/logs", headers=headers, params={"cursor": cursor}).status_code == 200
@@ -0,0 +1,49 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db import pool
+from app.db.pool import TimedQueuePool, engine_options, instrument_engine
+
+
+def _sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": "test"}) or 0.0
+
+
+def test_engine_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(pool.settings, "db_pool_size", 20)
+    monkeypatch.setattr(pool.settings, "db_pool_pre_ping", False)
+    options = engine_options("postgresql+asyncpg://u:p@db/prs", "async", asynchronous=True)
+    assert options["poolclass"] is pool.TimedAsyncAdaptedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is False
+    assert "pool_size" not in engine_options("sqlite:///:memory:", "sync")
+
+
+def test_pool_reports_checkout_wait_in_use_overflow_and_timeouts(tmp_path):
+    names = (
+        "db_pool_connections_in_use",
+        "db_pool_overflow_total",
+        "db_pool_checkout_timeouts_total",
+        "db_pool_checkout_duration_seconds_count",
+    )
+    before = {name: _sample(name) for name in names}
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01,
+        pool_logging_name="test",
+    )
+    instrument_engine(engine, "test")
+
+    first, second = engine.connect(), engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    delta = {name: _sample(name) - before[name] for name in names}
+    assert delta == dict(zip(names, (2, 1, 1, 3), strict=True))
+    first.close()
+    second.close()
+    assert _sample("db_pool_connections_in_use") == before["db_pool_connections_in_use"]
@@ -0,0 +1,66 @@
+from app.auth.principals import (
+    Principal,
+    PrincipalCache,
+    invalidate_principal,
+    principal_cache,
+    principal_generation,
+)
+from tests.test_api_integration import _client
+
+
+def _principal(user_id: int, token_version: int = 0) -> Principal:
+    return Principal(user_id, 1, f"user{user_id}@example.com", "analyst", token_version)
+
+
+def test_cache_is_bounded_lru_and_checks_token_version():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    cache.put(_principal(1))
+    cache.put(_principal(2))
+    assert cache.get(1, 0) is not None
+    cache.put(_principal(3))
+    assert cache.get(2, 0) is None
+    assert cache.get(1, 1) is None
+    assert cache.get(1, 0) is None
+    assert cache.stats() == {"hits": 1, "misses": 3, "size": 1}
+
+
+def test_cache_entries_expire():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=0)
+    cache.put(_principal(1))
+    assert cache.get(1, 0) is None
+
+
+def test_invalidation_retires_other_processes_entries():
+    other_worker = PrincipalCache(max_entries=2, ttl_seconds=60)
+    other_worker.put(_principal(7), principal_generation(7))
+    assert other_worker.get(7, 0, principal_generation(7)) is not None
+    invalidate_principal(7)
+    assert other_worker.get(7, 0, principal_generation(7)) is None
+
+
+def test_requests_reuse_principal_and_role_change_applies_to_existing_tokens():
+    client, _ = _client()
+    client.post(
+        "/auth/register",
+        params={"org_name": "Auth Org", "email": "admin@example.com", "password": "pass"},
+    )
+    admin = client.post("/auth/login", params={"email": "admin@example.com", "password": "pass"})
+    admin_headers = {"Authorization": f"Bearer {admin.json()['access_token']}"}
+    created = client.post(
+        "/users",
+        headers=admin_headers,
+        json={"email": "analyst@example.com", "password": "pass", "role": "analyst"},
+    )
+    login = client.post("/auth/login", params={"email": "analyst@example.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert client.get("/companies", headers=headers).status_code == 200
+    hits = principal_cache.hits
+    assert client.get("/companies", headers=headers).status_code == 200
+    assert principal_cache.hits == hits + 1
+    assert client.get("/users", headers=headers).status_code == 403
+
+    client.patch(
+        f"/users/{created.json()['id']}", headers=admin_headers, params={"role": "org_admin"}
+    )
+    assert client.get("/users", headers=headers).status_code == 200
@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.entities import Actual, AuditLog, Company, Mapping, Organization
+from app.services.mappings import upsert_mappings
+
+
+def _session():
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _plan(db, query) -> str:
+    sql = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    return "\n".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.mark.parametrize(
+    ("build", "index"),
+    [
+        (
+            lambda db: db.query(Actual).filter(
+                Actual.company_id == 1, Actual.period >= date(2024, 1, 1)
+            ),
+            "ix_actuals_company_period",
+        ),
+        (lambda db: db.query(Company).filter(Company.org_id == 1), "ix_companies_org_id"),
+        (
+            lambda db: db.query(Mapping).filter(
+                Mapping.company_id == 1, Mapping.source_account == "4000"
+            ),
+            "sqlite_autoindex_mappings",
+        ),
+        (
+            lambda db: db.query(AuditLog)
+            .filter(AuditLog.org_id == 1)
+            .order_by(AuditLog.created_at.desc()),
+            "ix_audit_logs_org_created",
+        ),
+        (
+            lambda db: db.query(AuditLog)
+            .filter(AuditLog.org_id == 1, AuditLog.action == "pack_generated")
+            .order_by(AuditLog.created_at.desc()),
+            "ix_audit_logs_org_action_created",
+        ),
+    ],
+)
+def test_hot_queries_use_indexes(build, index):
+    db = _session()
+    plan = _plan(db, build(db))
+    assert index in plan
+    assert "SCAN" not in plan.replace(f"USING INDEX {index}", "")
+    assert "TEMP B-TREE" not in plan
+
+
+def test_upsert_mappings_inserts_and_updates_in_place():
+    db = _session()
+    org = Organization(name="Org")
+    db.add(org)
+    db.flush()
+    company = Company(org_id=org.id, name="Acme")
+    db.add(company)
+    db.flush()
+    upsert_mappings(db, company.id, {"4000": "Revenue", "5000": "COGS"})
+    first_ids = dict(db.query(Mapping.source_account, Mapping.id))
+    upsert_mappings(db, company.id, {"5000": "Other OpEx", "6000": "G&A"})
+    rows = db.query(Mapping.id, Mapping.source_account, Mapping.canonical_category).all()
+    assert {(source, category) for _, source, category in rows} == {
+        ("4000", "Revenue"),
+        ("5000", "Other OpEx"),
+        ("6000", "G&A"),
+    }
+    assert {source: id_ for id_, source, _ in rows if source in first_ids} == first_ids
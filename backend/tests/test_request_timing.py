@@ -0,0 +1,27 @@
+import re
+
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+TIMING = re.compile(r"total;dur=([\d.]+), db;dur=([\d.]+), compute;dur=([\d.]+)")
+
+
+def test_request_id_is_echoed_or_generated():
+    client, _ = _client()
+    echoed = client.get("/health", headers={"X-Request-Id": "abc-123"})
+    assert echoed.headers["X-Request-Id"] == "abc-123"
+    assert len(client.get("/health").headers["X-Request-Id"]) == 36
+
+
+def test_server_timing_breaks_down_db_and_compute():
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    listing = client.get("/companies", headers=headers)
+    total, db, compute = map(float, TIMING.fullmatch(listing.headers["Server-Timing"]).groups())
+    assert db > 0 and compute == 0 and total >= db
+
+    pack = client.get(f"/companies/{company_id}/pack", headers=headers)
+    assert pack.status_code == 200
+    assert pack.content.startswith(b"PK")
+    total, db, compute = map(float, TIMING.fullmatch(pack.headers["Server-Timing"]).groups())
+    assert db > 0 and compute > 0 and total >= db + compute
@@ -0,0 +1,89 @@
+from io import BytesIO
+
+from app.api import routes
+from app.core.cache import get_cache
+from app.models.entities import Company
+from app.services.org_settings import OrgSettings, org_settings_cache
+from app.services.response_cache import bump_data_version, lookup_response
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+
+def test_etag_survives_until_version_bump_and_never_reuses_after_flush():
+    get_cache().flushdb()
+    first = lookup_response("dashboard", 1)
+    assert lookup_response("dashboard", 1, if_none_match=first.etag).not_modified
+    assert lookup_response("dashboard", 1, if_none_match=f'W/{first.etag}, "x"').not_modified
+    bump_data_version(1, company_id=2)
+    assert not lookup_response("dashboard", 1, if_none_match=first.etag).not_modified
+    get_cache().flushdb()
+    assert lookup_response("dashboard", 1).etag != first.etag
+
+
+def test_dashboard_and_kpis_serve_304_and_refresh_after_writes(monkeypatch):
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    computed = []
+    payload = routes._dashboard_payload
+
+    def _counting_payload(db, org_id):
+        computed.append(org_id)
+        return payload(db, org_id)
+
+    monkeypatch.setattr(routes, "_dashboard_payload", _counting_payload)
+
+    first = client.get("/portfolio/dashboard", headers=headers)
+    etag = first.headers["etag"]
+    assert first.json()["summary"][0]["revenue"] == 1000
+    assert client.get("/portfolio/dashboard", headers=headers).json() == first.json()
+    cached = client.get("/portfolio/dashboard", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert len(computed) == 1
+
+    csv_data = "period,category,amount\n2024-02-01,Revenue,1500\n2024-02-01,Cash,4000\n"
+    files = {"file": ("feb.csv", BytesIO(csv_data.encode("utf-8")), "text/csv")}
+    client.post(f"/companies/{company_id}/actuals", headers=headers, files=files)
+    refreshed = client.get("/portfolio/dashboard", headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["summary"][0]["revenue"] == 1500
+    assert len(computed) == 2
+
+    kpis = client.get(f"/companies/{company_id}/kpis", headers=headers)
+    assert [row["period"] for row in kpis.json()["kpis"]] == ["2024-01-01", "2024-02-01"]
+    kpi_etag = kpis.headers["etag"]
+    assert (
+        client.get(
+            f"/companies/{company_id}/kpis", headers={**headers, "If-None-Match": kpi_etag}
+        ).status_code
+        == 304
+    )
+    client.put(
+        "/org/settings",
+        headers=headers,
+        json={"runway_risk_threshold": 6, "revenue_drop_threshold": 1, "margin_drop_threshold": 0},
+    )
+    assert client.get(
+        "/portfolio/dashboard", headers={**headers, "If-None-Match": refreshed.headers["etag"]}
+    ).json()["risks"]
+    assert (
+        client.get(
+            f"/companies/{company_id}/kpis", headers={**headers, "If-None-Match": kpi_etag}
+        ).status_code
+        == 304
+    )
+    assert client.get("/companies/999/kpis", headers=headers).status_code == 404
+
+
+def test_dashboard_ignores_thresholds_cached_by_another_worker():
+    client, session_factory = _client()
+    headers, company_id = _setup(client)
+    with session_factory() as db:
+        org_id = db.get(Company, company_id).org_id
+    saved = client.put(
+        "/org/settings",
+        headers=headers,
+        json={"runway_risk_threshold": 6, "revenue_drop_threshold": 1, "margin_drop_threshold": 0},
+    ).json()
+    # Another worker still holds the defaults in its process cache.
+    org_settings_cache.put(OrgSettings(saved["id"], org_id, 0.0, -1.0, -1.0))
+    assert client.get("/portfolio/dashboard", headers=headers).json()["risks"]
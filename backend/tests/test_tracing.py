@@ -0,0 +1,63 @@
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from tests.test_api_integration import _client
+from tests.test_pack_jobs import _setup
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(scope="module")
+def spans():
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    processor = SimpleSpanProcessor(_exporter)
+    provider.add_span_processor(processor)
+    yield _exporter
+    # Stops the exporter collecting once this module is done.
+    processor.shutdown()
+    _exporter.clear()
+
+
+def _by_name(exporter: InMemorySpanExporter) -> dict[str, list]:
+    found: dict[str, list] = {}
+    for span in exporter.get_finished_spans():
+        found.setdefault(span.name, []).append(span)
+    return found
+
+
+def test_pack_download_records_a_span_per_stage(spans):
+    client, _ = _client()
+    headers, company_id = _setup(client)
+    spans.clear()
+    assert client.get(f"/companies/{company_id}/pack", headers=headers).status_code == 200
+
+    stages = _by_name(spans)
+    assert stages["pack.mapping_check"][0].attributes["mapping.unmapped"] == 0
+    assert stages["pack.cache_lookup"][0].attributes["cache.hit"] is False
+    assert stages["pack.load_kpis"][0].attributes["kpi.rows"] > 0
+    forecasts = stages["pack.forecast"]
+    assert {span.attributes["forecast.scenario"] for span in forecasts} == {
+        "Base",
+        "Upside",
+        "Downside",
+    }
+    assert all(span.attributes["forecast.rows"] == 12 for span in forecasts)
+    assert stages["pack.sensitivity_grid"][0].attributes["sensitivity.cells"] == 9
+    assert stages["pack.build_workbook"][0].attributes["workbook.bytes"] > 0
+
+
+def test_dashboard_records_load_and_risk_spans(spans):
+    client, _ = _client()
+    headers, _company_id = _setup(client)
+    spans.clear()
+    assert client.get("/portfolio/dashboard", headers=headers).status_code == 200
+
+    stages = _by_name(spans)
+    assert stages["dashboard.load_kpis"][0].attributes["dashboard.companies"] == 1
+    assert stages["dashboard.risks"][0].attributes["dashboard.companies"] == 1